@@ -5,7 +5,7 @@ except ModuleNotFoundError:
 
 
 class State:
-    def __init__(self, state, final=False, formatter=lambda x: str(x), shape='circle'):
+    def __init__(self, state, final=False, formatter=str, shape='circle'):
         self.state = state
         self.final = final
         self.transitions = {}
@@ -52,7 +52,7 @@ class State:
 
         return any(s.final for s in states)
 
-    def to_deterministic(self, formatter=lambda x: str(x)):
+    def to_deterministic(self, formatter=str):
         closure = self.epsilon_closure
         start = State(tuple(closure), any(s.final for s in closure), formatter)
 
@@ -1,4 +1,6 @@
-from .parsing import ShiftReduceParser, LL1Parser, SLR1Parser, LR1Parser, LALR1Parser
+from .parsing import ShiftReduceParser, LL1Parser, LLkParser, SLR1Parser, LR1Parser, MinimalLR1Parser, LALR1Parser
+from .automatas import AutomatonBudgetExceeded
 from .lexer import Lexer
 from .dtree import LLDerivationTree, LRDerivationTree
 from .cleaner import delete_common_prefix, delete_immediate_left_recursion, clean_grammar
+from .loader import load_grammar, load_bnf, load_jsonl
@@ -1,27 +1,258 @@
-from cmp.automata import State, multiline_formatter
-from cmp.pycompiler import Item
-from cmp.utils import ContainerSet
+import os
+import time
+from heapq import nlargest
+from itertools import repeat
 
-from .utils import compute_firsts, compute_local_first
+from cmp.automata import State
+from cmp.pycompiler import Item
+from cmp.utils import BitContainerSet, ContainerSet, bits
+
+from .lrautomaton import LRAutomaton, kernel_items
+from .utils import FirstCache, compute_firsts, first_cache, propagate, strongly_connected_components
+from .workers import SNAPSHOTS, process_pool, share, shared
+
+
+###########
+# BUDGETS #
+###########
+class AutomatonBudgetExceeded(Exception):
+    """
+    An automaton construction of the grammar G went over one of its budgets.
+
+    `limit` is the option exceeded ('max_states', 'max_items' or 'deadline') and `value` its value.
+    `states` and `items` are the states and kernel items built so far, `elapsed` the seconds spent,
+    `growth_rate` the states built per second and `heaviest` the (state, kernel) pairs with the most items,
+    with the states numbered in the order they were built.
+    """
+
+    def __init__(self, G, limit, value, states, items, elapsed, heaviest):
+        self.G = G
+        self.limit = limit
+        self.value = value
+        self.states = states
+        self.items = items
+        self.elapsed = elapsed
+        self.growth_rate = states / elapsed if elapsed > 0 else float('inf')
+        self.heaviest = heaviest
+        super().__init__(f'Automaton construction exceeded {limit}={value}: {states} states and {items} kernel '
+                         f'items in {elapsed:.2f}s ({self.growth_rate:.0f} states/s)')
+
+    def __reduce__(self):
+        # the grammar goes first, so its productions are built before the items of the kernels
+        return AutomatonBudgetExceeded, (self.G, self.limit, self.value, self.states, self.items, self.elapsed,
+                                         self.heaviest)
+
+
+class Budget:
+    """
+    Limits of an automaton construction. The builders call `grow` for every new state and `check`
+    while they work, `check` raises AutomatonBudgetExceeded once a limit is exceeded.
+    :param max_states: maximum number of states
+    :param max_items: maximum number of kernel items over all the states
+    :param deadline: maximum number of seconds since the construction started
+    """
+
+    heaviest = 5
+
+    def __init__(self, G, max_states=None, max_items=None, deadline=None):
+        self.G = G
+        self.max_states = max_states
+        self.max_items = max_items
+        self.deadline = deadline
+        self.started = time.perf_counter()
+        self.states = 0
+        self.items = 0
+
+    def grow(self, size):
+        self.states += 1
+        self.items += size
+
+    def check(self, kernels):
+        """
+        :param kernels: kernels of the states built, or a function that returns them.
+        A kernel is an iterable of items or a {center: lookaheads} dict, they are only read when a limit is exceeded
+        """
+        if self.max_states is not None and self.states > self.max_states:
+            self._exceeded('max_states', self.max_states, kernels)
+        if self.max_items is not None and self.items > self.max_items:
+            self._exceeded('max_items', self.max_items, kernels)
+        if self.deadline is not None and time.perf_counter() - self.started > self.deadline:
+            self._exceeded('deadline', self.deadline, kernels)
+
+    def _exceeded(self, limit, value, kernels):
+        if callable(kernels):
+            kernels = kernels()
+        heaviest = []
+        for state in nlargest(self.heaviest, range(len(kernels)), key=lambda i: len(kernels[i])):
+            kernel = kernels[state]
+            if isinstance(kernel, dict):
+                kernel = [Item(center.production, center.pos, lookaheads) for center, lookaheads in kernel.items()]
+            heaviest.append((state, frozenset(kernel)))
+        raise AutomatonBudgetExceeded(self.G, limit, value, self.states, self.items, time.perf_counter() - self.started,
+                                      heaviest)
 
 
 ################
 # SLR AUTOMATA #
 ################
-def closure_lr0(items):
-    closure = ContainerSet(*items)
+class ClosureTemplates:
+    """
+    Closure of every non terminal, computed once per grammar the first time it is needed.
+
+    `lr0(A)` are the items B -> . gamma added by the closure of any item X -> alpha . A beta.
+    `lr1(A)` are the triples (B, spontaneous, propagates): the closure of X -> alpha . A beta, L
+    adds the productions of B with the lookaheads `spontaneous`, plus First(beta L) if `propagates`.
+    With them the closure of a kernel is a union of templates, one per kernel item.
+    """
+
+    def __init__(self, G, cache):
+        self.G = G
+        self.cache = cache
+        self._lr0 = {}
+        self._lr1 = {}
+
+    def lr0(self, nonterminal):
+        try:
+            return self._lr0[nonterminal]
+        except KeyError:
+            pass
+
+        heads = self.G.headIndex
+        items = self._lr0[nonterminal] = frozenset(Item(p, 0) for B, _, _ in self._reach(nonterminal, False)
+                                                   for p in heads.get(B, []))
+        return items
+
+    def lr1(self, nonterminal):
+        try:
+            return self._lr1[nonterminal]
+        except KeyError:
+            template = self._lr1[nonterminal] = self._reach(nonterminal, True)
+            return template
+
+    def _reach(self, nonterminal, lookaheads):
+        # closure of the productions of `nonterminal` with an unknown lookahead set L
+        spontaneous = {nonterminal: frozenset()}
+        propagates = {nonterminal: True}
+
+        heads = self.G.headIndex
+        pending = [nonterminal]
+        while pending:
+            B = pending.pop()
+            for production in heads.get(B, []):
+                if not len(production.Right) or not production.Right[0].IsNonTerminal:
+                    continue
+
+                # B -> . C delta, L gives C the lookaheads First(delta L), which is empty when the
+                # lookaheads of B are, as it happens below a non productive symbol
+                C = production.Right[0]
+                if lookaheads and (spontaneous[B] or propagates[B]):
+                    first_delta = self.cache(production, 1)
+                    new_spontaneous = frozenset(first_delta)
+                    new_propagates = first_delta.contains_epsilon and propagates[B]
+                    if first_delta.contains_epsilon:
+                        new_spontaneous |= spontaneous[B]
+                else:
+                    new_spontaneous, new_propagates = frozenset(), False
+
+                try:
+                    if new_spontaneous <= spontaneous[C] and new_propagates <= propagates[C]:
+                        continue
+                    spontaneous[C] |= new_spontaneous
+                    propagates[C] |= new_propagates
+                except KeyError:
+                    spontaneous[C] = new_spontaneous
+                    propagates[C] = new_propagates
+                pending.append(C)
+
+        return [(B, spontaneous[B], propagates[B]) for B in spontaneous]
+
+    def closure_lr0(self, items):
+        closure = set(items)
+        for item in items:
+            symbol = item.NextSymbol
+            if symbol is not None and symbol.IsNonTerminal:
+                closure.update(self.lr0(symbol))
+        return frozenset(closure)
+
+    def closure_lr1(self, items):
+        # lookaheads of every center, the kernel items are merged with the items added by the templates
+        centers = {}
+        for item in items:
+            center = item.Center()
+            try:
+                centers[center] |= item.lookaheads
+            except KeyError:
+                centers[center] = set(item.lookaheads)
+
+        heads = {}
+        for item in items:
+            A = item.NextSymbol
+            if A is None or not A.IsNonTerminal:
+                continue
+
+            # First(beta L) of the kernel item X -> alpha . A beta, L. The templates assume it is not empty,
+            # when it is, as below a non productive symbol, A and what it reaches get no lookaheads
+            incoming = set()
+            if item.lookaheads:
+                first_beta = self.cache(item.production, item.pos + 1)
+                incoming.update(first_beta)
+                if first_beta.contains_epsilon:
+                    incoming |= item.lookaheads
+
+            for B, spontaneous, propagates in self.lr1(A):
+                try:
+                    lookaheads = heads[B]
+                except KeyError:
+                    lookaheads = heads[B] = set()
+                if incoming:
+                    lookaheads |= spontaneous
+                    if propagates:
+                        lookaheads |= incoming
+
+        for B, lookaheads in heads.items():
+            for production in self.G.headIndex.get(B, []):
+                center = Item(production, 0)
+                try:
+                    centers[center] |= lookaheads
+                except KeyError:
+                    centers[center] = set(lookaheads)
+
+        return frozenset(Item(center.production, center.pos, lookaheads) for center, lookaheads in centers.items())
+
+
+def closure_templates(G, container=ContainerSet):
+    """
+    ClosureTemplates of G, shared by every automaton built for the same grammar
+    """
+    return G.memo(('closure_templates', container),
+                  lambda grammar: ClosureTemplates(grammar, first_cache(grammar, container)))
+
+
+def productions_of(G, symbol):
+    """
+    Productions of `symbol` in G, or in the grammar that created the symbol when G is None.
+    A copy of a grammar (e.g. the memoized augmented grammar) shares the symbols of the original,
+    so the closures over a copy must be given it.
+    """
+    return symbol.productions if G is None else G.headIndex.get(symbol, [])
+
+
+def closure_lr0(items, G=None):
+    closure = set(items)
+    expanded = set()
 
     pending = list(items)
     while pending:
         current = pending.pop()
         symbol = current.NextSymbol
 
-        if current.IsReduceItem or symbol.IsTerminal:
+        if current.IsReduceItem or symbol.IsTerminal or symbol in expanded:
             continue
+        expanded.add(symbol)
 
-        new_items = [Item(p, 0) for p in symbol.productions if Item(p, 0) not in closure]
+        new_items = [Item(p, 0) for p in productions_of(G, symbol) if Item(p, 0) not in closure]
         pending += new_items
-        closure.extend(new_items)
+        closure.update(new_items)
     return frozenset(closure)
 
 
@@ -29,159 +260,456 @@ def goto_lr0(items, symbol):
     return frozenset(item.NextItem() for item in items if item.NextSymbol == symbol)
 
 
-def build_lr0_automaton(G):
-    assert len(G.startSymbol.productions) == 1, 'Grammar must be augmented'
+def symbol_rank(G):
+    """
+    Position of every symbol of G in the order the builders create transitions
+    """
+    return {symbol: i for i, symbol in enumerate(G.terminals + G.nonTerminals)}
 
-    start_production = G.startSymbol.productions[0]
+
+def goto_kernels(items, rank):
+    """
+    Kernels of the gotos of `items` bucketed by the symbol after the dot in a single pass.
+    Only symbols that appear after a dot get a kernel, they are returned in the order given by `rank`
+    :return: list of (symbol, kernel)
+    """
+    buckets = {}
+    for item in items:
+        symbol = item.NextSymbol
+        if symbol is not None:
+            try:
+                buckets[symbol].append(item.NextItem())
+            except KeyError:
+                buckets[symbol] = [item.NextItem()]
+
+    return [(symbol, frozenset(buckets[symbol])) for symbol in sorted(buckets, key=rank.__getitem__)]
+
+
+def reusable_gotos(G, previous, rank):
+    """
+    Gotos of the states of `previous`, the automaton of an earlier version of G, that the edits of the
+    grammar cannot change, in the items and symbols of G.
+
+    Productions are matched by the names of their symbols, a non terminal changed if its set of bodies did.
+    A name shared by two symbols (e.g. the S' of the augmentation and an S' made by the cleaner) can not be
+    matched, the productions that use it are always treated as changed and no goto on it is reused.
+    The closure of a kernel only expands the non terminals after a dot and, from them, the first symbol of
+    the bodies, so a state is kept when no kernel item belongs to a changed non terminal and no symbol after
+    a dot reaches one that way: its closure and its gotos are the same in both grammars.
+    Only the positions of the kernel items are read, so the lookaheads of `previous` are ignored.
+    :return: dict kernel -> list of (symbol, kernel) in the order given by `rank`
+    """
+    F, old = G.freeze(), previous.grammar.freeze()
+
+    def key(production):
+        return production.Left.Name, tuple(symbol.Name for symbol in production.Right)
+
+    # names of more than one symbol of either grammar
+    duplicated = set()
+    for grammar in (old, F):
+        seen = set()
+        for symbol in grammar.symbols:
+            if symbol.Name in seen:
+                duplicated.add(symbol.Name)
+            seen.add(symbol.Name)
+
+    # a non terminal with a repeated body or using a duplicated name can not be matched by names,
+    # it is always treated as changed
+    repeated = set()
+
+    def bodies(productions):
+        by_head = {}
+        for production in productions:
+            head, body = key(production)
+            if body in by_head.setdefault(head, set()) or head in duplicated or duplicated.intersection(body):
+                repeated.add(head)
+            by_head[head].add(body)
+        return by_head
+
+    old_bodies, new_bodies = bodies(old.Productions), bodies(F.Productions)
+    changed = {X for X in old_bodies.keys() | new_bodies.keys() if old_bodies.get(X) != new_bodies.get(X)}
+    changed |= repeated
+
+    # non terminals that reach a changed one through the first symbol of the bodies (the leading index of G),
+    # the edges out of the unchanged non terminals are the same in both grammars
+    reaching = set(changed)
+    pending = list(changed)
+    named = {}
+    for symbol in F.nonTerminals:
+        named.setdefault(symbol.Name, []).append(symbol)
+    while pending:
+        for symbol in named.get(pending.pop(), []):
+            for production in G.leadingIndex.get(symbol, []):
+                X = production.Left.Name
+                if X not in reaching:
+                    reaching.add(X)
+                    pending.append(X)
+
+    # old production id -> production of G
+    productions = {}
+    for production in F.Productions:
+        productions.setdefault(key(production), production)
+    matches = [productions.get(key(production)) for production in old.Productions]
+    names = [symbol.Name for symbol in old.symbols]
+
+    kept = []
+    for state in range(len(previous)):
+        for i in range(previous.kernel_offsets[state], previous.kernel_offsets[state + 1]):
+            p, pos = divmod(previous.centers[i], previous.stride)
+            body = old.body(p)
+            if names[old.heads[p]] in changed or pos < len(body) and names[body[pos]] in reaching:
+                break
+        else:
+            kept.append(state)
+
+    kernels = {}
+
+    def kernel(state):
+        try:
+            return kernels[state]
+        except KeyError:
+            pass
+        items = []
+        for i in range(previous.kernel_offsets[state], previous.kernel_offsets[state + 1]):
+            p, pos = divmod(previous.centers[i], previous.stride)
+            if matches[p] is None:
+                items = None
+                break
+            items.append(Item(matches[p], pos))
+        kernels[state] = items = None if items is None else frozenset(items)
+        return items
+
+    symbols = {symbol.Name: symbol for symbol in F.symbols if symbol.Name not in duplicated}
+    reusable = {}
+    for state in kept:
+        gotos = [(symbols.get(names[symbol]), kernel(target)) for symbol, target in previous.transitions(state)]
+        if kernel(state) is not None and all(symbol is not None and target is not None for symbol, target in gotos):
+            reusable[kernel(state)] = sorted(gotos, key=lambda goto: rank[goto[0]])
+    return reusable
+
+
+def build_lr0_automaton(G, templates=None, max_states=None, max_items=None, deadline=None, previous=None):
+    """
+    With `previous`, the LR(0) or LALR(1) automaton of an earlier version of G, the states that the edits
+    of the grammar cannot change take their transitions from it and only the others compute their closure.
+    The automaton is the same one a full construction builds.
+    """
+    assert len(G.headIndex.get(G.startSymbol, [])) == 1, 'Grammar must be augmented'
+    budget = Budget(G, max_states, max_items, deadline)
+
+    if templates is None:
+        templates = closure_templates(G)
+
+    start_production = G.headIndex.get(G.startSymbol, [])[0]
     start_item = Item(start_production, 0)
     start = frozenset([start_item])
 
-    automaton = State(closure_lr0(start), True)
+    kernels = [start]
+    transitions = [[]]
+    budget.grow(len(start))
 
-    pending = [start]
-    visited = {start: automaton}
+    pending = [0]
+    visited = {start: 0}
+    rank = symbol_rank(G)
+    ids = G.freeze().ids
+    reusable = {} if previous is None else reusable_gotos(G, previous, rank)
 
     while pending:
+        budget.check(kernels)
         current = pending.pop()
-        current_state = visited[current]
-        current_closure = current_state.state
-        for symbol in G.terminals + G.nonTerminals:
-            kernel = goto_lr0(current_closure, symbol)
-
-            if kernel == frozenset():
-                continue
-
+        try:
+            gotos = reusable[kernels[current]]
+        except KeyError:
+            gotos = goto_kernels(templates.closure_lr0(kernels[current]), rank)
+        for symbol, kernel in gotos:
             try:
                 next_state = visited[kernel]
             except KeyError:
-                next_state = visited[kernel] = State(closure_lr0(kernel), True)
-                pending.append(kernel)
+                next_state = visited[kernel] = len(kernels)
+                kernels.append(kernel)
+                transitions.append([])
+                pending.append(next_state)
+                budget.grow(len(kernel))
 
-            current_state.add_transition(symbol.Name, next_state)
-    automaton.set_formatter(multiline_formatter)
-    return automaton
+            budget.check(kernels)
+            transitions[current].append((ids[symbol], next_state))
+    return LRAutomaton(G, kernels, transitions, templates=templates, lookaheads=False)
 
 
 ########################
 # LR1 & LALR1 AUTOMATA #
 ########################
-def compress(items):
-    centers = {}
+def closure_lr1(items, firsts, cache=None, G=None):
+    if cache is None:
+        cache = FirstCache(firsts)
 
+    # lookaheads of every center, merged in place. A center is expanded when it is reached and
+    # again only with the lookaheads it gained since then
+    centers = {}
+    pending = []
     for item in items:
         center = item.Center()
         try:
             lookaheads = centers[center]
         except KeyError:
-            centers[center] = lookaheads = set()
-        lookaheads.update(item.lookaheads)
-
-    return {Item(x.production, x.pos, set(lookahead)) for x, lookahead in centers.items()}
-
-
-def expand(item, firsts):
-    next_symbol = item.NextSymbol
-    if next_symbol is None or not next_symbol.IsNonTerminal:
-        return []
-
-    lookaheads = ContainerSet()
-
-    for preview in item.Preview():
-        local_first = compute_local_first(firsts, preview)
-        lookaheads.update(local_first)
-
-    assert not lookaheads.contains_epsilon
+            centers[center] = set(item.lookaheads)
+            pending.append((center, item.lookaheads))
+            continue
+        delta = item.lookaheads - lookaheads
+        if delta:
+            lookaheads |= delta
+            pending.append((center, delta))
 
-    return [Item(p, 0, lookaheads) for p in next_symbol.productions]
+    # centers whose First(beta) was already given to their expansion
+    spontaneous = set()
+    while pending:
+        center, delta = pending.pop()
+        next_symbol = center.NextSymbol
+        if next_symbol is None or not next_symbol.IsNonTerminal:
+            continue
 
+        # First(beta a) for every new lookahead a is First(beta), plus the lookaheads if beta ->* epsilon
+        new_lookaheads = set()
+        if delta:
+            first_beta = cache(center.production, center.pos + 1)
+            if center not in spontaneous:
+                spontaneous.add(center)
+                new_lookaheads.update(first_beta)
+            if first_beta.contains_epsilon:
+                new_lookaheads |= delta
+
+        for production in productions_of(G, next_symbol):
+            child = Item(production, 0)
+            try:
+                lookaheads = centers[child]
+            except KeyError:
+                centers[child] = set(new_lookaheads)
+                pending.append((child, new_lookaheads))
+                continue
+            delta_child = new_lookaheads - lookaheads
+            if delta_child:
+                lookaheads |= delta_child
+                pending.append((child, delta_child))
 
-def closure_lr1(items, firsts):
-    closure = ContainerSet(*items)
-    changed = True
-    while changed:
-        new_items = ContainerSet()
-        for item in closure:
-            new_items.extend(expand(item, firsts))
-        changed = closure.update(new_items)
-    return compress(closure)
+    return frozenset(Item(center.production, center.pos, lookaheads) for center, lookaheads in centers.items())
 
 
-def goto_lr1(items, symbol, firsts=None, just_kernel=False):
+def goto_lr1(items, symbol, firsts=None, just_kernel=False, cache=None, G=None):
     assert just_kernel or firsts is not None, '`firsts` must be provided if `just_kernel=False`'
     items = frozenset(item.NextItem() for item in items if item.NextSymbol == symbol)
-    return items if just_kernel else closure_lr1(items, firsts)
-
+    return items if just_kernel else closure_lr1(items, firsts, cache, G)
 
-def build_lr1_automaton(G, firsts=None):
-    assert len(G.startSymbol.productions) == 1, 'Grammar must be augmented'
 
+def firsts_with_eof(G, firsts=None):
+    """
+    Copy of the FIRST sets of G with the one of EOF, in the container of the others. The given sets may be
+    the memoized ones of G, shared by every parser of the grammar, so they are not changed
+    """
     if not firsts:
         firsts = compute_firsts(G)
-    firsts[G.EOF] = ContainerSet(G.EOF)
+    sample = next(iter(firsts.values()), None)
+    firsts = dict(firsts)
+    if isinstance(sample, BitContainerSet):
+        firsts[G.EOF] = BitContainerSet(G.EOF, universe=sample.universe)
+    else:
+        firsts[G.EOF] = ContainerSet(G.EOF)
+    return firsts
 
-    start_production = G.startSymbol.productions[0]
+
+def build_lr1_automaton(G, firsts=None, cache=None, templates=None, max_states=None, max_items=None, deadline=None):
+    assert len(G.headIndex.get(G.startSymbol, [])) == 1, 'Grammar must be augmented'
+    budget = Budget(G, max_states, max_items, deadline)
+
+    firsts = firsts_with_eof(G, firsts)
+
+    start_production = G.headIndex.get(G.startSymbol, [])[0]
     start_item = Item(start_production, 0, lookaheads=(G.EOF,))
     start = frozenset([start_item])
+    if cache is None:
+        cache = FirstCache(firsts)
+    if templates is None:
+        templates = ClosureTemplates(G, cache)
 
-    closure = closure_lr1(start, firsts)
-    automaton = State(frozenset(closure), True)
+    kernels = [start]
+    transitions = [[]]
+    budget.grow(len(start))
 
-    pending = [start]
-    visited = {start: automaton}
+    pending = [0]
+    visited = {start: 0}
+    rank = symbol_rank(G)
+    ids = G.freeze().ids
 
     while pending:
+        budget.check(kernels)
         current = pending.pop()
-        current_state = visited[current]
-
-        current_closure = current_state.state
-        for symbol in G.terminals + G.nonTerminals:
-            kernel = goto_lr1(current_closure, symbol, just_kernel=True)
-
-            if kernel == frozenset():
-                continue
-
+        for symbol, kernel in goto_kernels(templates.closure_lr1(kernels[current]), rank):
             try:
                 next_state = visited[kernel]
             except KeyError:
-                goto = closure_lr1(kernel, firsts)
-                visited[kernel] = next_state = State(frozenset(goto), True)
-                pending.append(kernel)
-            current_state.add_transition(symbol.Name, next_state)
-
-    automaton.set_formatter(multiline_formatter)
-    return automaton
-
-
-def build_larl1_automaton(G, firsts=None):
-    assert len(G.startSymbol.productions) == 1, 'Grammar must be augmented'
-
-    if not firsts:
-        firsts = compute_firsts(G)
-    firsts[G.EOF] = ContainerSet(G.EOF)
-
-    start_production = G.startSymbol.productions[0]
+                next_state = visited[kernel] = len(kernels)
+                kernels.append(kernel)
+                transitions.append([])
+                pending.append(next_state)
+                budget.grow(len(kernel))
+            budget.check(kernels)
+            transitions[current].append((ids[symbol], next_state))
+
+    return LRAutomaton(G, kernels, transitions, templates=templates)
+
+
+class ItemCodec:
+    """
+    Canonical integer encoding of LR(1) items over the ids of a FrozenGrammar.
+
+    The item (p, pos, L) is `(p * stride + pos) << terminal_count | mask(L)` and a set of items is
+    the sorted tuple of its codes, so equal kernels have equal codes in every process.
+    """
+
+    def __init__(self, G):
+        self.F = F = G.freeze()
+        self.stride = max((len(p.Right) for p in F.Productions), default=0) + 1
+        self.shift = F.terminal_count
+        self._lookaheads = {}
+
+    def encode(self, items):
+        F, stride, shift = self.F, self.stride, self.shift
+        ids, production_ids = F.ids, F.production_ids
+        codes = []
+        for item in items:
+            mask = 0
+            for lookahead in item.lookaheads:
+                mask |= 1 << ids[lookahead]
+            codes.append((production_ids[item.production] * stride + item.pos) << shift | mask)
+        codes.sort()
+        return tuple(codes)
+
+    def decode(self, codes):
+        F, stride, shift = self.F, self.stride, self.shift
+        low = (1 << shift) - 1
+        items = []
+        for code in codes:
+            p, pos = divmod(code >> shift, stride)
+            mask = code & low
+            try:
+                lookaheads = self._lookaheads[mask]
+            except KeyError:
+                lookaheads = self._lookaheads[mask] = frozenset(F.symbols[i] for i in bits(mask))
+            items.append(Item(F.Productions[p], pos, lookaheads))
+        return frozenset(items)
+
+
+def _expand_kernel(key, kernel):
+    """
+    Worker side of build_lr1_automaton_parallel: gotos of an encoded kernel
+    :return: list of (symbol id, encoded kernel) in rank order
+    """
+    G = shared(key)
+    codec = G.memo('item_codec', ItemCodec)
+    templates = closure_templates(G)
+    rank = G.memo('symbol_rank', symbol_rank)
+    ids = codec.F.ids
+
+    closure = templates.closure_lr1(codec.decode(kernel))
+    return [(ids[symbol], codec.encode(items)) for symbol, items in goto_kernels(closure, rank)]
+
+
+def _install_snapshot(key, snapshot):
+    SNAPSHOTS[key] = snapshot
+
+
+def build_lr1_automaton_parallel(G, workers=None, chunksize=None, templates=None, max_states=None, max_items=None,
+                                 deadline=None):
+    """
+    Same automaton as build_lr1_automaton with the closures and gotos computed in a process pool.
+
+    The kernels are expanded by levels: the workers expand the whole frontier and the coordinator
+    deduplicates the new kernels by their ItemCodec encoding. The transitions of every state are added
+    in the order of `symbol_rank`, as in the sequential build, so the states are numbered the same.
+    :param workers: number of processes, by default the number of CPUs
+    :param chunksize: kernels sent to a worker at once, by default the frontier is split in about
+    four chunks per worker
+    :param templates: ClosureTemplates the automaton uses to compute its closures
+    """
+    assert len(G.headIndex.get(G.startSymbol, [])) == 1, 'Grammar must be augmented'
+    budget = Budget(G, max_states, max_items, deadline)
+
+    codec = ItemCodec(G)
+    start_production = G.headIndex.get(G.startSymbol, [])[0]
+    start = codec.encode([Item(start_production, 0, lookaheads=(G.EOF,))])
+
+    key = ('lr1', G.fingerprint())
+    share(key, G)
+    n = workers or os.cpu_count() or 1
+
+    def kernels():
+        return [codec.decode(kernel) for kernel in discovered]
+
+    transitions = {}
+    discovered = {start: None}
+    frontier = [start]
+    budget.grow(len(start))
+    try:
+        with process_pool(workers, _install_snapshot, (key, SNAPSHOTS[key])) as pool:
+            while frontier:
+                size = chunksize or max(1, len(frontier) // (4 * n))
+                expanded = pool.map(_expand_kernel, repeat(key), frontier, chunksize=size)
+
+                next_frontier = []
+                try:
+                    for kernel, gotos in zip(frontier, expanded):
+                        transitions[kernel] = gotos
+                        for _, target in gotos:
+                            if target not in discovered:
+                                discovered[target] = None
+                                next_frontier.append(target)
+                                budget.grow(len(target))
+                        budget.check(kernels)
+                except AutomatonBudgetExceeded:
+                    pool.shutdown(cancel_futures=True)
+                    raise
+                frontier = next_frontier
+    finally:
+        SNAPSHOTS.pop(key, None)
+
+    index = {kernel: i for i, kernel in enumerate(transitions)}
+    return LRAutomaton(G, [codec.decode(kernel) for kernel in transitions],
+                       [[(symbol, index[target]) for symbol, target in gotos] for gotos in transitions.values()],
+                       index[start], templates=templates)
+
+
+def build_larl1_automaton(G, firsts=None, cache=None, max_states=None, max_items=None, deadline=None):
+    assert len(G.headIndex.get(G.startSymbol, [])) == 1, 'Grammar must be augmented'
+    budget = Budget(G, max_states, max_items, deadline)
+
+    firsts = firsts_with_eof(G, firsts)
+
+    start_production = G.headIndex.get(G.startSymbol, [])[0]
     start_item = Item(start_production, 0, lookaheads=ContainerSet(G.EOF))
     start = frozenset([start_item.Center()])
+    if cache is None:
+        cache = FirstCache(firsts)
 
-    closure = closure_lr1([start_item], firsts)
+    closure = closure_lr1([start_item], firsts, cache, G)
     automaton = State(frozenset(closure), True)
+    budget.grow(len(start))
+
+    def kernels():
+        return [kernel_items(G, state.state) for state in visited.values()]
 
     pending = [start]
     visited = {start: automaton}
+    rank = symbol_rank(G)
 
     while pending:
+        budget.check(kernels)
         current = pending.pop()
         current_state = visited[current]
 
         current_closure = current_state.state
-        for symbol in G.terminals + G.nonTerminals:
-            goto = goto_lr1(current_closure, symbol, just_kernel=True)
-            closure = closure_lr1(goto, firsts)
+        for symbol, goto in goto_kernels(current_closure, rank):
+            closure = closure_lr1(goto, firsts, cache, G)
             center = frozenset(item.Center() for item in goto)
 
-            if center == frozenset():
-                continue
-
             try:
                 next_state = visited[center]
                 centers = {item.Center(): item for item in next_state.state}
@@ -199,11 +727,233 @@ def build_larl1_automaton(G, firsts=None):
             except KeyError:
                 visited[center] = next_state = State(frozenset(closure), True)
                 pending.append(center)
+                budget.grow(len(center))
 
+            budget.check(kernels)
             if current_state[symbol.Name] is None:
                 current_state.add_transition(symbol.Name, next_state)
             else:
                 assert current_state.get(symbol.Name) is next_state, 'Bad build!!!'
 
-    automaton.set_formatter(multiline_formatter)
-    return automaton
+    return LRAutomaton.from_state(G, automaton)
+
+
+def build_lalr1_automaton(G, templates=None, max_states=None, max_items=None, deadline=None, previous=None):
+    """
+    LALR(1) automaton computed from the LR(0) automaton with the DeRemer-Pennello relations.
+
+    For every non terminal transition (p, A), walking the productions B -> beta A gamma of every
+    transition (p', B) with p' --beta--> p:
+        Follow(p, A) gets First(gamma)        if Follow(p', B) is not empty
+        (p, A) includes (p', B)               if gamma ->* epsilon
+    Follow is the first sets closed under includes, and the lookaheads of an item A -> alpha . beta in q
+    are the union of Follow(p, A) for every p --alpha--> q (lookback). The closure is computed once per
+    strongly connected component.
+
+    First(gamma) takes the place of the reads relation over the shifts of the automaton. Both are the same
+    on reduced grammars, but an item with no lookaheads, below a non productive symbol, gives nothing in
+    the LR(1) automaton, so the first sets only count from the transitions whose Follow is not empty, as
+    the LALR(1) automaton that merges the LR(1) states does.
+    The state and item budgets apply to the LR(0) automaton, the deadline to the whole construction.
+    With `previous` the LR(0) automaton reuses its states as in build_lr0_automaton, the lookaheads
+    are computed again from the transitions, which needs no closure.
+    """
+    assert len(G.headIndex.get(G.startSymbol, [])) == 1, 'Grammar must be augmented'
+    budget = Budget(G, max_states, max_items, deadline)
+
+    F = G.freeze()
+    ids = F.ids
+    firsts = compute_firsts(G, BitContainerSet)
+    automaton = build_lr0_automaton(G, templates, max_states, max_items, deadline, previous)
+    states = range(len(automaton))
+    budget.states, budget.items = len(automaton), len(automaton.centers)
+
+    def kernels():
+        return [automaton.kernel(state) for state in states]
+
+    # non terminal transitions (p, A) with dense ids
+    symbols = F.symbols
+    transitions = {}
+    for state in states:
+        budget.check(kernels)
+        for symbol, _ in automaton.transitions(state):
+            if not F.is_terminal[symbol]:
+                transitions[state, symbols[symbol]] = len(transitions)
+
+    # suffixes[production][i] -> (First, nullable) of the body from position i as a terminal mask
+    suffixes = {}
+    for production in F.Productions:
+        suffix = [(0, True)]
+        for symbol in reversed(production.Right):
+            mask, nullable_gamma = suffix[-1]
+            first = firsts[symbol]
+            suffix.append((first.mask | (mask if first.contains_epsilon else 0),
+                           nullable_gamma and first.contains_epsilon))
+        suffixes[production] = suffix[::-1]
+
+    # (p', B) gives (p, A) its First(gamma) and, through includes, its Follow, so (p, A) has lookaheads
+    # when (p', B) does and gamma is not empty or ->* epsilon
+    generated = []
+    successors = [[] for _ in transitions]
+    includes = [[] for _ in transitions]
+    # lookback: path of states of every production of A from p
+    paths = {}
+
+    for (state, symbol), t in transitions.items():
+        budget.check(kernels)
+        for production in G.headIndex.get(symbol, []):
+            # p --beta--> q for every prefix beta of the body
+            path = [state]
+            for body_symbol in production.Right:
+                path.append(automaton.goto(path[-1], ids[body_symbol]))
+            paths[t, production] = path
+
+            suffix = suffixes[production]
+            for i, body_symbol in enumerate(production.Right):
+                if body_symbol.IsTerminal:
+                    continue
+                target = transitions[path[i], body_symbol]
+                first_gamma, nullable_gamma = suffix[i + 1]
+                if first_gamma:
+                    generated.append((t, target, first_gamma))
+                if nullable_gamma:
+                    includes[target].append(t)
+                if first_gamma or nullable_gamma:
+                    successors[t].append(target)
+
+    start_production = G.headIndex.get(G.startSymbol, [])[0]
+    start_symbol = start_production.Right[0]
+    # S' -> . S $
+    start = transitions[0, start_symbol]
+    live = bytearray(len(transitions))
+    live[start] = True
+    pending = [start]
+    while pending:
+        for target in successors[pending.pop()]:
+            if not live[target]:
+                live[target] = True
+                pending.append(target)
+
+    first_gammas = [0] * len(transitions)
+    first_gammas[start] = 1 << ids[G.EOF]
+    for t, target, first_gamma in generated:
+        if live[t]:
+            first_gammas[target] |= first_gamma
+
+    nodes = range(len(transitions))
+    follow = propagate(strongly_connected_components(nodes, includes), first_gammas, includes)
+    budget.check(kernels)
+
+    # every kernel item along the path of a production of A from p gets Follow(p, A),
+    # the lookaheads of the closure items follow from the kernels
+    lookaheads = {}
+    for (t, production), path in paths.items():
+        for pos in range(1, len(path)):
+            key = path[pos], production, pos
+            lookaheads[key] = lookaheads.get(key, 0) | follow[t]
+
+    path = [0]
+    for symbol in start_production.Right:
+        path.append(automaton.goto(path[-1], ids[symbol]))
+    for pos, state in enumerate(path):
+        lookaheads[state, start_production, pos] = 1 << ids[G.EOF]
+
+    # lookahead sets are built once per distinct mask
+    lookahead_sets = {}
+    kernels = []
+    for state in states:
+        items = []
+        for item in automaton.kernel(state):
+            mask = lookaheads[state, item.production, item.pos]
+            try:
+                lookahead_set = lookahead_sets[mask]
+            except KeyError:
+                lookahead_set = lookahead_sets[mask] = frozenset(symbols[i] for i in bits(mask))
+            items.append(Item(item.production, item.pos, lookahead_set))
+        kernels.append(items)
+
+    return LRAutomaton(G, kernels, [automaton.transitions(state) for state in states], templates=automaton.templates)
+
+
+def weakly_compatible(kernel1, kernel2):
+    """
+    Pager's weak compatibility of two kernels with the same core, given as {center: lookaheads}.
+    Merging weakly compatible states cannot add a reduce-reduce conflict that the canonical LR(1)
+    automaton does not have.
+    """
+    centers = list(kernel1)
+    for i, a in enumerate(centers):
+        L_a, M_a = kernel1[a], kernel2[a]
+        for b in centers[i + 1:]:
+            L_b, M_b = kernel1[b], kernel2[b]
+            if (L_a & M_b or L_b & M_a) and not L_a & L_b and not M_a & M_b:
+                return False
+    return True
+
+
+def build_minimal_lr1_automaton(G, firsts=None, cache=None, templates=None, max_states=None, max_items=None,
+                                deadline=None):
+    """
+    LR(1) automaton where a new state is merged into an existing state with the same core
+    whenever both kernels are weakly compatible (Pager). A merged state that gains lookaheads
+    is closed again and its transitions are recomputed.
+    """
+    assert len(G.headIndex.get(G.startSymbol, [])) == 1, 'Grammar must be augmented'
+    budget = Budget(G, max_states, max_items, deadline)
+
+    firsts = firsts_with_eof(G, firsts)
+    if cache is None:
+        cache = FirstCache(firsts)
+    if templates is None:
+        templates = ClosureTemplates(G, cache)
+
+    start_production = G.headIndex.get(G.startSymbol, [])[0]
+    start_item = Item(start_production, 0, lookaheads=(G.EOF,))
+    transitions = [{}]
+
+    # kernels[state] -> {center: lookaheads}, cores[core] -> states with that core
+    kernels = [{start_item.Center(): start_item.lookaheads}]
+    cores = {frozenset(kernels[0]): [0]}
+    budget.grow(1)
+
+    pending = [0]
+    queued = {0}
+    rank = symbol_rank(G)
+    ids = G.freeze().ids
+
+    while pending:
+        budget.check(kernels)
+        current_state = pending.pop()
+        queued.discard(current_state)
+
+        items = [Item(center.production, center.pos, lookaheads)
+                 for center, lookaheads in kernels[current_state].items()]
+        for symbol, kernel in goto_kernels(templates.closure_lr1(items), rank):
+            lookaheads = {item.Center(): item.lookaheads for item in kernel}
+            core = frozenset(lookaheads)
+
+            for next_state in cores.get(core, ()):
+                kernel_state = kernels[next_state]
+                if weakly_compatible(kernel_state, lookaheads):
+                    merged = {center: kernel_state[center] | lookaheads[center] for center in core}
+                    if merged != kernel_state:
+                        kernels[next_state] = merged
+                        if next_state not in queued:
+                            queued.add(next_state)
+                            pending.append(next_state)
+                    break
+            else:
+                next_state = len(kernels)
+                transitions.append({})
+                kernels.append(lookaheads)
+                cores.setdefault(core, []).append(next_state)
+                queued.add(next_state)
+                pending.append(next_state)
+                budget.grow(len(core))
+                budget.check(kernels)
+
+            transitions[current_state][ids[symbol]] = next_state
+
+    kernels = [[Item(center.production, center.pos, lookaheads) for center, lookaheads in kernel.items()]
+               for kernel in kernels]
+    return LRAutomaton(G, kernels, [list(targets.items()) for targets in transitions], templates=templates)
@@ -6,52 +6,62 @@ def delete_common_prefix(G: Grammar):
     Algoritmo para eliminar los prefijos comunes de las producciones con la misma cabecera
     Por cada no terminal busca si dos de sus produciones tiene prefijos comunes
     """
+    # Los no terminales nuevos se agregan al final de G.nonTerminals y tambien son procesados
     for nonterminal in G.nonTerminals:
         change = True
         primes = ''
         while change:
             change = False
-            for production0 in nonterminal.productions:
-                _continue = False
-                for production1 in nonterminal.productions:
-                    if production0 != production1:
-                        lpc = 0
-                        for i in range((min(len(production0.Right), len(production1.Right)))):
-                            if production0.Right[i] == production1.Right[i]:
-                                lpc += 1
-                            else:
-                                break
-                        # En caso de que si tengan prefijos comunes se realiza el siguiente cambio:
-                        # E -> aA | aB
-                        # Entonces se cambia por :
-                        # E -> aE'
-                        # E' -> A | B
-                        if lpc > 0:
-                            primes += '\''
-                            temp = G.NonTerminal(f"{nonterminal.Name}{primes}", False)
-                            nonterminal.productions.remove(production0)
-                            nonterminal.productions.remove(production1)
-                            G.Productions.remove(production0)
-                            G.Productions.remove(production1)
-                            nonterminal %= Sentence(*production0.Right[0:lpc] + (temp,))
-                            alpha = production0.Right[lpc:]
-                            betha = production1.Right[lpc:]
-                            if len(alpha) == 0:
-                                temp %= G.Epsilon
-                            else:
-                                temp %= Sentence(*alpha)
-                            if len(betha) == 0:
-                                temp %= G.Epsilon
-                            else:
-                                temp %= Sentence(*betha)
-                            change = True
-                            _continue = True
-                            break
-                if _continue:
+            # Se recorren por posicion las producciones de la cabecera mientras se modifican
+            i = 0
+            while i < len(G.headIndex.get(nonterminal, [])):
+                production0 = G.headIndex[nonterminal][i]
+                i += 1
+                production1 = common_prefix_partner(G, production0)
+                if production1 is None:
                     continue
+                lpc = 0
+                for j in range((min(len(production0.Right), len(production1.Right)))):
+                    if production0.Right[j] == production1.Right[j]:
+                        lpc += 1
+                    else:
+                        break
+                # En caso de que si tengan prefijos comunes se realiza el siguiente cambio:
+                # E -> aA | aB
+                # Entonces se cambia por :
+                # E -> aE'
+                # E' -> A | B
+                primes += '\''
+                temp = G.NonTerminal(f"{nonterminal.Name}{primes}", False)
+                G.Remove_Production(production0)
+                G.Remove_Production(production1)
+                nonterminal %= Sentence(*production0.Right[0:lpc] + (temp,))
+                alpha = production0.Right[lpc:]
+                betha = production1.Right[lpc:]
+                if len(alpha) == 0:
+                    temp %= G.Epsilon
+                else:
+                    temp %= Sentence(*alpha)
+                if len(betha) == 0:
+                    temp %= G.Epsilon
+                else:
+                    temp %= Sentence(*betha)
+                change = True
     return G
 
 
+def common_prefix_partner(G: Grammar, production):
+    """
+    First other production of the same head starting with the same symbol, read from `G.leadingIndex`
+    """
+    if len(production.Right) == 0:
+        return None
+    for other in G.leadingIndex[production.Right[0]]:
+        if other.Left == production.Left and other != production:
+            return other
+    return None
+
+
 def delete_immediate_left_recursion(G: Grammar):
     """
     Algoritmo para eliminar la recursion izquierda inmediata
@@ -59,7 +69,7 @@ def delete_immediate_left_recursion(G: Grammar):
 
     for symbol in G.nonTerminals:
         if any(not body.IsEpsilon and body[0] == symbol for _, body in symbol.productions):
-            last_productions = set(symbol.productions)
+            last_productions = list(symbol.productions)
             A = G.NonTerminal(f"{symbol}'")
 
             new_sents = [body + A for _, body in symbol.productions if body.IsEpsilon or body[0] != symbol]
@@ -73,8 +83,8 @@ def delete_immediate_left_recursion(G: Grammar):
                 # A -> b A'
                 symbol %= sent
 
-            symbol.productions = list(set(symbol.productions) - last_productions)
-            G.Productions = list(set(G.Productions) - last_productions)
+            for production in last_productions:
+                G.Remove_Production(production)
 
     return G
 
@@ -105,21 +115,25 @@ def delete_epsilon(G: Grammar):
     #
     # Example:
     # A ->* epsilon => A is nullable
+    #
+    # remaining[p] counts the symbols of the body of p that are not known to be nullable yet,
+    # when it reaches zero the head of p becomes nullable.
     nullable = set()
-    change = True
-    while change:
-        n = len(nullable)
-        for head, body in G.Productions:
-
-            if head in nullable:
-                continue
-
-            if len(body) == 0:
-                nullable.add(head)
-            else:
-                if all(symbol in nullable for symbol in body):
-                    nullable.add(head)
-        change = n != len(nullable)
+    pending = []
+    remaining = {}
+    for production in G.Productions:
+        remaining[id(production)] = len(production.Right)
+        if len(production.Right) == 0 and production.Left not in nullable:
+            nullable.add(production.Left)
+            pending.append(production.Left)
+
+    while pending:
+        symbol = pending.pop()
+        for production, _ in G.occurrenceIndex.get(symbol, []):
+            remaining[id(production)] -= 1
+            if remaining[id(production)] == 0 and production.Left not in nullable:
+                nullable.add(production.Left)
+                pending.append(production.Left)
 
     # Now we have al non terminals nullables for every production
     # then if a production contains a nullable non terminal it will be replaced by the same production
@@ -130,8 +144,7 @@ def delete_epsilon(G: Grammar):
         while stack:
             production = stack.pop()
             if production.Right.IsEpsilon:
-                G.Productions.remove(production)
-                nonterminal.productions.remove(production)
+                G.Remove_Production(production)
             else:
                 _, body = production
                 for i, symbol in enumerate(body):
@@ -152,22 +165,43 @@ def delete_unary_productions(G: Grammar):
     AFTER  : A -> C | D | EF
 
              B -> C | D | EF
+
+    Unlike a plain expansion, a body that the head already has is not added again, so A -> B | c
+    with B -> c gives A -> c once.
     """
-    change = True
-    while change:
-        change = False
-        for production in G.Productions:
-            head, body = production
-            if len(body) == 1 and body[0] in G.nonTerminals:
-                G.Productions.remove(production)
-                head.productions.remove(production)
-                for _, right in body[0].productions:
-                    head %= right
-                change = True
+    # Cada produccion unaria pendiente se elimina y se suben las producciones de su cuerpo,
+    # el par (A, B) de A -> B solo se expande una vez para que los ciclos A -> B -> A terminen
+    pending = [production for production in G.Productions if is_unary(production)]
+    expanded = set()
+    # cabecera -> cuerpos (tuplas) que ya tiene, para no repetirlos
+    bodies = {}
+    while pending:
+        production = pending.pop()
+        head, body = production
+        if head not in bodies:
+            bodies[head] = {tuple(right) for _, right in G.headIndex.get(head, [])}
+        bodies[head].discard(tuple(body))
+        G.Remove_Production(production)
+
+        if body[0] == head or (head, body[0]) in expanded:
+            continue
+        expanded.add((head, body[0]))
+
+        for _, right in list(G.headIndex.get(body[0], [])):
+            if tuple(right) in bodies[head]:
+                continue
+            bodies[head].add(tuple(right))
+            head %= right
+            if is_unary(G.headIndex[head][-1]):
+                pending.append(G.headIndex[head][-1])
     return G
 
 
-def delete_nonterminal_variables(G: Grammar):
+def is_unary(production):
+    return len(production.Right) == 1 and production.Right[0].IsNonTerminal
+
+
+def delete_nonterminal_variables(G: Grammar, derive_to_terminal=None):
     # Todas aquellos no terminales que no deriven en algun string terminal tras 1 o mas producciones
     # No son necesarias pues las cadenas siempre estaran formadas unicaente por terminales
     # y produciones que no generen terminales son inconsistentes con esta verdad
@@ -177,80 +211,98 @@ def delete_nonterminal_variables(G: Grammar):
     # Computamos el conjunto de las produciones que derivan en terminales tra una o mas produciones
     # La demostracion de la correctitud de este algoritmo puede ser inductiva
     # buscamos las cadenas que terminen en terminales tras una produccion luego tras dos y asi sucesivamente
-    derive_to_terminal = set()
-    change = True
-    while change:
-        n = len(derive_to_terminal)
-        for nonterminal in G.nonTerminals:
-            for _, body in nonterminal.productions:
-                if all(symbol in derive_to_terminal for symbol in body if symbol.IsNonTerminal):
-                    derive_to_terminal.add(nonterminal)
-        change = n != len(derive_to_terminal)
+    #
+    # El conjunto puede venir ya calculado, por ejemplo por compute_productive_matrix
+    if derive_to_terminal is None:
+        derive_to_terminal = compute_productive(G)
 
     # Las produciones posean uno de los terminales que no derivan en string terminales son incosistentes
     # Pues estas no terminarian en un string terminal
     # Ya sea si lo poseen en la cabecera como en el cuerpo  de la produccion
     # estas producciones inconsistentes son guardadas en Removable
-    removable = set()
+    removable = []
     for prod in G.Productions:
         head, body = prod
         if head in derive_to_terminal:
             if any(symbol not in derive_to_terminal for symbol in body if symbol.IsNonTerminal):
-                removable.add(prod)
+                removable.append(prod)
         else:
-            removable.add(prod)
+            removable.append(prod)
 
     # Son removidas de la gramatica las producciones y no terminales inconsistentes
     for production in removable:
-        G.Productions.remove(production)
-        production.Left.productions.remove(production)
+        G.Remove_Production(production)
 
-    for nonterminal in G.nonTerminals:
-        if not nonterminal.productions:
-            G.nonTerminals.remove(nonterminal)
+    for nonterminal in [nonterminal for nonterminal in G.nonTerminals if not nonterminal.productions]:
+        G.Remove_Symbol(nonterminal)
 
     return G
 
 
-def delete_unreachable_variables(G: Grammar):
-    # Para eliminar mas rapido castearemos las listas a set,
-    # de esta forma la eliminacion sera O(1)
-    G.terminals = set(G.terminals)
-    G.nonTerminals = set(G.nonTerminals)
-    G.Productions = set(G.Productions)
-
-    # Los elementos que no pueden ser alcanzados por una o mas producciones del caracter inicial
-    # No son necesarias pues nunca son utilizadas para generar ningun elemento del lenguaje
-    # estos elementos inalcanzables pueden ser tanto terminales como no terminales
+def compute_productive(G: Grammar):
+    """
+    No terminales de G que derivan en una cadena de terminales
+    """
+    # remaining[p] cuenta los no terminales del cuerpo de p que aun no derivan en terminales,
+    # cuando llega a cero la cabecera de p deriva en terminales
+    derive_to_terminal = set()
+    pending = []
+    remaining = {}
+    for production in G.Productions:
+        remaining[id(production)] = sum(1 for symbol in production.Right if symbol.IsNonTerminal)
+        if remaining[id(production)] == 0 and production.Left not in derive_to_terminal:
+            derive_to_terminal.add(production.Left)
+            pending.append(production.Left)
+
+    while pending:
+        symbol = pending.pop()
+        for production, _ in G.occurrenceIndex.get(symbol, []):
+            remaining[id(production)] -= 1
+            if remaining[id(production)] == 0 and production.Left not in derive_to_terminal:
+                derive_to_terminal.add(production.Left)
+                pending.append(production.Left)
+
+    return derive_to_terminal
+
+
+def compute_reachable(G: Grammar):
+    """
+    Terminales y no terminales de G alcanzables desde el simbolo inicial
+    """
     stack = [G.startSymbol]
-    reacheable_nonterminals = {G.startSymbol}
-    reacheable_terminals = set()
+    reachable = {G.startSymbol}
 
-    # Encontramos los terminales y no terminales alcanzables
     while stack:
         current = stack.pop()
         for _, body in current.productions:
             for symbol in body:
-                if symbol.IsNonTerminal:
-                    if symbol not in reacheable_nonterminals:
-                        reacheable_nonterminals.add(symbol)
+                if symbol not in reachable:
+                    reachable.add(symbol)
+                    if symbol.IsNonTerminal:
                         stack.append(symbol)
-                else:
-                    reacheable_terminals.add(symbol)
 
-    # Eliminamos las producciones con elementos no alcanzables
-    G.Productions -= {production for production in G.Productions if production.Left not in reacheable_nonterminals}
+    return reachable
 
-    # Ahora removemos los no terminales no alcanzables
-    G.nonTerminals -= {nonterminal for nonterminal in G.nonTerminals if nonterminal not in reacheable_nonterminals}
 
-    # Ahora removemos los terminales no alcanzables
-    G.terminals -= {terminal for terminal in G.terminals if terminal not in reacheable_terminals}
+def delete_unreachable_variables(G: Grammar, reachable=None):
+    # Los elementos que no pueden ser alcanzados por una o mas producciones del caracter inicial
+    # No son necesarias pues nunca son utilizadas para generar ningun elemento del lenguaje
+    # estos elementos inalcanzables pueden ser tanto terminales como no terminales
+    # El conjunto puede venir ya calculado, por ejemplo por compute_reachable_matrix
+    if reachable is None:
+        reachable = compute_reachable(G)
+    reacheable_nonterminals = {symbol for symbol in reachable if symbol.IsNonTerminal}
+    reacheable_terminals = {symbol for symbol in reachable if symbol.IsTerminal}
 
-    # Finalmente casteamos a lista otra vez
-    G.terminals = list(G.terminals)
-    G.nonTerminals = list(G.nonTerminals)
-    G.Productions = list(G.Productions)
+    # Eliminamos las producciones con elementos no alcanzables
+    for production in [p for p in G.Productions if p.Left not in reacheable_nonterminals]:
+        G.Remove_Production(production)
+
+    # Ahora removemos los no terminales y terminales no alcanzables
+    unreachable = [nonterminal for nonterminal in G.nonTerminals if nonterminal not in reacheable_nonterminals]
+    unreachable += [terminal for terminal in G.terminals if terminal not in reacheable_terminals]
+    for symbol in unreachable:
+        G.Remove_Symbol(symbol)
     return G
 
 
@@ -60,12 +60,10 @@ def shortest_production_path(G, x):
     sentence_form = {x: Sentence(x)}
     production_path = {x: [Production(x, Sentence(x))]}  # Eliminar esta linea de testeo
 
-    productions = set(G.Productions)
     while queue:
         current = queue.popleft()
 
-        visited_productions = set()
-        for production in productions:
+        for production, _ in G.occurrenceIndex.get(current, []):
 
             head, body = production
 
@@ -73,21 +71,15 @@ def shortest_production_path(G, x):
                 continue
 
             sentence = Sentence()
-            current_belong = False
-            for i, symbol in enumerate(body):
+            for symbol in body:
                 if symbol == current:
-                    current_belong = True
                     sentence += sentence_form[current]
                 else:
                     sentence += symbol
 
-            if current_belong:
-                queue.append(head)
-                sentence_form[head] = sentence
-                production_path[head] = [production] + production_path[current]
-                visited_productions.add(production)
-
-        productions -= visited_productions
+            queue.append(head)
+            sentence_form[head] = sentence
+            production_path[head] = [production] + production_path[current]
 
     assert G.startSymbol in sentence_form, f'{x} is not reacheable from start symbol {G.startSymbol}'
 
@@ -107,10 +99,12 @@ class LLConflictStringGenerator:
     def __generate_conflict(self):
         G = self.G
         x = self.conflict.nonterminal
-        s = self.conflict.terminal
+        lookahead = self.conflict.terminal
         table = self.table
 
-        conflict1, conflict2 = table[x, s][0], table[x, s][1]
+        conflict1, conflict2 = table[x, lookahead][0], table[x, lookahead][1]
+        # LL(k) conflicts have a tuple of terminals as lookahead, the strings are built from the first one
+        s = lookahead[0] if isinstance(lookahead, tuple) else lookahead
         sentence, _ = shortest_production_path(G, x)
         sentence_forms = compute_sentence(G)
         sentence_forms_fixxed = compute_fixxed_sentence(G, s, sentence_forms)
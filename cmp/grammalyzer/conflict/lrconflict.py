@@ -1,8 +1,9 @@
 from collections import deque
 
-from cmp.automata import State
 from cmp.pycompiler import Sentence
 
+from ..lrautomaton import LRState
+
 
 def path_from(s):
     """
@@ -169,7 +170,7 @@ def expand_path(init, path, follows):
                 path = path[:i] + subpath + path[i + 2:]
                 break
 
-    return Sentence(*[s for s in path if not isinstance(s, State)])
+    return Sentence(*[s for s in path if not isinstance(s, LRState)])
 
 
 class LRConflictStringGenerator:
@@ -186,7 +187,7 @@ class LRConflictStringGenerator:
         stateID = parser.state_dict
         state = parser.conflict.state
         symbol = parser.conflict.symbol
-        init = parser.automaton
+        init = parser.automaton[0]
         _, production = parser.action[state, symbol].pop()
         path = sentence_path(init, stateID[state], symbol, production)
 
@@ -0,0 +1,225 @@
+import json
+import time
+
+from cmp.pycompiler import Grammar, Production, Sentence
+
+
+class LoadReport:
+    """
+    Statistics of a grammar load, `errors` are the problems found in the input that did not stop the load
+    """
+
+    def __init__(self, productions, symbols, seconds, errors=()):
+        self.productions = productions
+        self.symbols = symbols
+        self.seconds = seconds
+        self.errors = list(errors)
+
+    @property
+    def rate(self):
+        """
+        Load throughput in productions per second
+        """
+        return self.productions / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self):
+        text = f'{self.productions} productions, {self.symbols} symbols in {self.seconds:.3f}s ' \
+               f'({self.rate:.0f} productions/s)'
+        if self.errors:
+            text += f', {len(self.errors)} errors'
+        return text
+
+    def __repr__(self):
+        return str(self)
+
+
+class GrammarBuilder:
+    """
+    Interns the symbols of a grammar while its productions are streamed in.
+
+    Declared terminals are terminals, any other name is a non terminal (the yacc convention),
+    so every production can be added as soon as it is read. The start symbol is the declared one
+    or else the head of the first production, a later declaration can only name that same symbol.
+    A terminal declared after its name was used as a non terminal stays a non terminal and is
+    recorded in `errors`.
+    """
+
+    def __init__(self):
+        self.G = Grammar()
+        self.symbols = {'epsilon': self.G.Epsilon, '$': self.G.EOF}
+        self.start = None
+        self.implicit_start = False
+        self.count = 0
+        self.errors = []
+        self.begin = time.perf_counter()
+
+    def terminals(self, names, line=None):
+        for name in names:
+            try:
+                symbol = self.symbols[name]
+            except KeyError:
+                self.symbols[name] = self.G.Terminal(name)
+                continue
+
+            if symbol.IsNonTerminal:
+                where = f'Line {line}: ' if line is not None else ''
+                self.errors.append(f'{where}"{name}" is declared as a terminal after it was used as a non terminal, '
+                                   f'declare the terminals before the productions')
+
+    def nonterminals(self, names):
+        for name in names:
+            self.nonterminal(name)
+
+    def nonterminal(self, name):
+        try:
+            symbol = self.symbols[name]
+        except KeyError:
+            symbol = self.symbols[name] = self.G.NonTerminal(name, name == self.start)
+
+        if not symbol.IsNonTerminal:
+            raise ValueError(f'"{name}" is declared as a terminal and cannot be a non terminal')
+        return symbol
+
+    def start_symbol(self, name):
+        if self.implicit_start:
+            if self.G.startSymbol.Name != name:
+                raise ValueError(f'%start {name} comes after the productions, which already made '
+                                 f'"{self.G.startSymbol.Name}" the start symbol, declare %start before the productions')
+            self.implicit_start = False
+            self.start = name
+            return
+        if self.G.startSymbol is not None:
+            raise ValueError('Cannot define more than one start symbol.')
+        self.start = name
+        if name in self.symbols:
+            self.G.startSymbol = self.nonterminal(name)
+
+    def production(self, head, body):
+        head = self.nonterminal(head)
+        if self.G.startSymbol is None and self.start is None:
+            self.G.startSymbol = head
+            self.implicit_start = True
+
+        symbols = self.symbols
+        sentence = []
+        for name in body:
+            try:
+                sentence.append(symbols[name])
+            except KeyError:
+                sentence.append(self.nonterminal(name))
+
+        self.G.Add_Production(Production(head, Sentence(*sentence) if sentence else self.G.Epsilon))
+        self.count += 1
+
+    def build(self):
+        seconds = time.perf_counter() - self.begin
+        return self.G, LoadReport(self.count, len(self.symbols) - 2, seconds, self.errors)
+
+
+def load_jsonl(lines):
+    """
+    Stream a grammar in JSON lines format, every line is one of the objects
+
+        {"Terminals": ["+", "num"]}
+        {"NonTerminals": ["E", "T"]}
+        {"StartSymbol": "E"}
+        {"Head": "E", "Body": ["E", "+", "T"]}
+
+    :param lines: iterable of text lines, e.g. an open file
+    :return: (Grammar, LoadReport)
+    """
+    builder = GrammarBuilder()
+
+    for n, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Line {n}: {e.msg}')
+
+        if 'Head' in record:
+            builder.production(record['Head'], record.get('Body', ()))
+        else:
+            builder.terminals(record.get('Terminals', ()), n)
+            if 'StartSymbol' in record:
+                try:
+                    builder.start_symbol(record['StartSymbol'])
+                except ValueError as e:
+                    raise ValueError(f'Line {n}: {e}')
+            builder.nonterminals(record.get('NonTerminals', ()))
+
+    return builder.build()
+
+
+def load_bnf(lines):
+    """
+    Stream a grammar in plain BNF text format
+
+        %terminals + * ( ) num
+        %start E
+        E -> E + T | T
+        T -> T * F
+           | F
+        F -> ( E ) | num
+        X -> epsilon
+
+    Lines starting with '#' are comments and a line starting with '|' continues the alternatives
+    of the previous head. Names not declared with %terminals before their first use are non terminals.
+
+    :param lines: iterable of text lines, e.g. an open file
+    :return: (Grammar, LoadReport)
+    """
+    builder = GrammarBuilder()
+    head = None
+
+    for n, line in enumerate(lines, 1):
+        tokens = line.split()
+        if not tokens or tokens[0].startswith('#'):
+            continue
+
+        directive = tokens[0]
+        if directive == '%terminals':
+            builder.terminals(tokens[1:], n)
+            continue
+        if directive == '%nonterminals':
+            builder.nonterminals(tokens[1:])
+            continue
+        if directive == '%start':
+            if len(tokens) != 2:
+                raise ValueError(f'Line {n}: %start expects one symbol')
+            try:
+                builder.start_symbol(tokens[1])
+            except ValueError as e:
+                raise ValueError(f'Line {n}: {e}')
+            continue
+
+        if len(tokens) > 1 and tokens[1] == '->':
+            head, tokens = tokens[0], tokens[2:]
+        elif directive == '|' and head is not None:
+            tokens = tokens[1:]
+        else:
+            raise ValueError(f'Line {n}: expected "Head -> body" or "| body"')
+
+        body = []
+        for token in tokens:
+            if token == '|':
+                builder.production(head, body)
+                body = []
+            elif token != 'epsilon':
+                body.append(token)
+        builder.production(head, body)
+
+    return builder.build()
+
+
+def load_grammar(path):
+    """
+    Load a grammar file, '.jsonl' files are read as JSON lines and any other file as BNF text
+    :return: (Grammar, LoadReport)
+    """
+    with open(path, encoding='utf8') as file:
+        if path.endswith('.jsonl'):
+            return load_jsonl(file)
+        return load_bnf(file)
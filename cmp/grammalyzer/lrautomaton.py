@@ -0,0 +1,289 @@
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+try:
+    import pydot
+except ModuleNotFoundError:
+    pass
+
+from cmp.automata import multiline_formatter
+from cmp.pycompiler import Item
+
+
+def kernel_items(G, closure):
+    """
+    Kernel of a closure: the items with the dot after the first symbol and the start item
+    """
+    start_symbol = G.startSymbol
+    return [item for item in closure if item.pos or item.production.Left == start_symbol]
+
+
+def dfs_order(transitions, start=0):
+    """
+    States reachable from `start` in the order a recursive depth first search visits them,
+    following the transitions of every state in the order they are given
+    :param transitions: list of (symbol id, target) lists indexed by state
+    """
+    order = [start]
+    seen = bytearray(len(transitions))
+    seen[start] = True
+
+    stack = [iter(transitions[start])]
+    while stack:
+        for _, target in stack[-1]:
+            if not seen[target]:
+                seen[target] = True
+                order.append(target)
+                stack.append(iter(transitions[target]))
+                break
+        else:
+            stack.pop()
+    return order
+
+
+class LRAutomaton:
+    """
+    LR automaton with dense state ids, the initial state is 0.
+
+    The states are numbered in the order a depth first search from the initial state visits them,
+    which is the numbering of the parsing tables. Per state it keeps:
+        the kernel items, in `centers[kernel_offsets[i]:kernel_offsets[i + 1]]` as production id * stride + pos,
+        with the index of their lookahead set in `lookahead_sets` at the same positions of `kernel_lookaheads`
+        the transitions, in `symbols[transition_offsets[i]:transition_offsets[i + 1]]` sorted by symbol id
+        and `targets` at the same positions
+    Every field is an array or a flat list, so it pickles without walking a graph of objects.
+
+    Closures are not stored, `closure(i)` computes them from the kernel with the ClosureTemplates of the
+    grammar and keeps the last `cache_size` of them in a LRU cache.
+    """
+
+    def __init__(self, G, kernels, transitions, start=0, templates=None, lookaheads=True, cache_size=1024):
+        """
+        :param G: augmented grammar
+        :param kernels: kernel items of every state built
+        :param transitions: list of (symbol id, target) of every state built, the states are numbered
+        following them from `start` and the ones that are not reachable are dropped
+        :param templates: ClosureTemplates of G, `closure_templates(G)` if it is not given
+        :param lookaheads: True if the closures are LR(1) closures, False for LR(0)
+        :param cache_size: maximum number of closures kept
+        """
+        F = G.freeze()
+        self.grammar = G
+        self.stride = max((len(p.Right) for p in F.Productions), default=0) + 1
+        self.templates = templates
+        self.lookaheads = lookaheads
+        self.epsilon = any(not len(p.Right) for p in F.Productions)
+        self.cache_size = cache_size
+        self._closures = OrderedDict()
+
+        order = dfs_order(transitions, start)
+        index = {state: i for i, state in enumerate(order)}
+
+        self.transition_offsets = array('i', [0])
+        self.symbols = array('i')
+        self.targets = array('i')
+        for state in order:
+            for symbol, target in sorted(transitions[state]):
+                self.symbols.append(symbol)
+                self.targets.append(index[target])
+            self.transition_offsets.append(len(self.symbols))
+
+        self.kernel_offsets = array('i', [0])
+        self.centers = array('i')
+        self.kernel_lookaheads = array('i')
+        self.lookahead_sets = [frozenset()]
+        lookahead_ids = {frozenset(): 0}
+        production_ids = F.production_ids
+        for state in order:
+            kernel = sorted((production_ids[item.production] * self.stride + item.pos, item.lookaheads)
+                            for item in kernels[state])
+            for center, lookaheads in kernel:
+                self.centers.append(center)
+                try:
+                    self.kernel_lookaheads.append(lookahead_ids[lookaheads])
+                except KeyError:
+                    lookahead_ids[lookaheads] = len(self.lookahead_sets)
+                    self.kernel_lookaheads.append(len(self.lookahead_sets))
+                    self.lookahead_sets.append(lookaheads)
+            self.kernel_offsets.append(len(self.centers))
+
+        self._symbol_ids = None
+
+    @staticmethod
+    def from_state(G, automaton):
+        """
+        LRAutomaton with the states and transitions of a cmp.automata.State graph
+        """
+        ids = {symbol.Name: i for i, symbol in enumerate(G.freeze().symbols)}
+        states = list(automaton)
+        index = {id(state): i for i, state in enumerate(states)}
+        transitions = [[(ids[name], index[id(target)]) for name, targets in state.transitions.items()
+                        for target in targets] for state in states]
+        return LRAutomaton(G, [kernel_items(G, state.state) for state in states], transitions,
+                           lookaheads=any(item.lookaheads for state in states for item in state.state))
+
+    def __len__(self):
+        return len(self.kernel_offsets) - 1
+
+    def __getitem__(self, idx):
+        if not 0 <= idx < len(self):
+            raise IndexError(f'state {idx} out of range')
+        return LRState(self, idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield LRState(self, idx)
+
+    def closure(self, idx):
+        closures = self._closures
+        try:
+            closure = closures[idx]
+        except KeyError:
+            pass
+        else:
+            closures.move_to_end(idx)
+            return closure
+
+        if self.templates is None:
+            from .automatas import closure_templates
+            self.templates = closure_templates(self.grammar)
+        kernel = self.kernel(idx)
+        closure = closures[idx] = self.templates.closure_lr1(kernel) if self.lookaheads else \
+            self.templates.closure_lr0(kernel)
+        if len(closures) > self.cache_size:
+            closures.popitem(last=False)
+        return closure
+
+    def reduce_items(self, idx):
+        """
+        Reduce items of state `idx`, without epsilon productions they are all in the kernel
+        and the closure is not computed
+        """
+        items = self.closure(idx) if self.epsilon else self.kernel(idx)
+        return [item for item in items if item.IsReduceItem]
+
+    def kernel(self, idx):
+        productions = self.grammar.freeze().Productions
+        items = []
+        for i in range(self.kernel_offsets[idx], self.kernel_offsets[idx + 1]):
+            p, pos = divmod(self.centers[i], self.stride)
+            items.append(Item(productions[p], pos, self.lookahead_sets[self.kernel_lookaheads[i]]))
+        return frozenset(items)
+
+    def goto(self, idx, symbol):
+        """
+        Target of the transition of state `idx` by the symbol with id `symbol`, -1 if there is none
+        """
+        lo, hi = self.transition_offsets[idx], self.transition_offsets[idx + 1]
+        i = bisect_left(self.symbols, symbol, lo, hi)
+        if i < hi and self.symbols[i] == symbol:
+            return self.targets[i]
+        return -1
+
+    def transitions(self, idx):
+        """
+        list of (symbol id, target) of state `idx` sorted by symbol id
+        """
+        lo, hi = self.transition_offsets[idx], self.transition_offsets[idx + 1]
+        return list(zip(self.symbols[lo:hi], self.targets[lo:hi]))
+
+    def symbol_id(self, name):
+        if self._symbol_ids is None:
+            self._symbol_ids = {symbol.Name: i for i, symbol in enumerate(self.grammar.freeze().symbols)}
+        return self._symbol_ids[name]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_symbol_ids'] = state['templates'] = None
+        state['_closures'] = OrderedDict()
+        return state
+
+    def graph(self):
+        G = pydot.Dot(rankdir='LR', margin=0.1)
+        G.add_node(pydot.Node('start', shape='plaintext', label='', width=0, height=0))
+
+        symbols = self.grammar.freeze().symbols
+        for idx in range(len(self)):
+            G.add_node(pydot.Node(idx, label=multiline_formatter(self.closure(idx)), shape='circle', style='bold'))
+        for idx in range(len(self)):
+            for symbol, target in self.transitions(idx):
+                G.add_edge(pydot.Edge(idx, target, label=symbols[symbol].Name, labeldistance=2))
+        G.add_edge(pydot.Edge('start', 0, label='', style='dashed'))
+
+        return G
+
+    def _repr_svg_(self):
+        try:
+            return self.graph().create_svg().decode('utf8')
+        except:
+            pass
+
+    def write_to(self, fname):
+        return self.graph().write_svg(fname)
+
+
+class LRState:
+    """
+    View of a state of an LRAutomaton with the interface of cmp.automata.State used by the
+    conflict generators: `state`, `transitions`, `get`, `has_transition` and iteration over the
+    states reachable from it. Two views of the same state are equal.
+    """
+    __slots__ = ('automaton', 'idx')
+
+    final = True
+
+    def __init__(self, automaton, idx):
+        self.automaton = automaton
+        self.idx = idx
+
+    @property
+    def state(self):
+        return self.automaton.closure(self.idx)
+
+    @property
+    def kernel(self):
+        return self.automaton.kernel(self.idx)
+
+    @property
+    def transitions(self):
+        symbols = self.automaton.grammar.freeze().symbols
+        return {symbols[symbol].Name: [LRState(self.automaton, target)]
+                for symbol, target in self.automaton.transitions(self.idx)}
+
+    @property
+    def name(self):
+        return multiline_formatter(self.state)
+
+    def has_transition(self, symbol):
+        return self.automaton.goto(self.idx, self.automaton.symbol_id(symbol)) >= 0
+
+    def get(self, symbol):
+        target = self.automaton.goto(self.idx, self.automaton.symbol_id(symbol))
+        assert target >= 0
+        return LRState(self.automaton, target)
+
+    def __getitem__(self, symbol):
+        target = self.automaton.goto(self.idx, self.automaton.symbol_id(symbol))
+        return [LRState(self.automaton, target)] if target >= 0 else None
+
+    def __iter__(self):
+        automaton = self.automaton
+        transitions = [automaton.transitions(idx) for idx in range(len(automaton))]
+        for idx in dfs_order(transitions, self.idx):
+            yield LRState(automaton, idx)
+
+    def graph(self):
+        return self.automaton.graph()
+
+    def __eq__(self, other):
+        return isinstance(other, LRState) and self.automaton is other.automaton and self.idx == other.idx
+
+    def __hash__(self):
+        return hash(self.idx)
+
+    def __repr__(self):
+        return str(self)
+
+    def __str__(self):
+        return str(self.state)
@@ -0,0 +1,203 @@
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    pass
+
+from cmp.utils import ContainerSet
+
+from .utils import container_builder
+
+
+def _product(A, B):
+    """
+    Boolean matrix product, done in float32 so it runs on BLAS
+    """
+    return (A.astype(np.float32) @ B.astype(np.float32)) > 0
+
+
+def transitive_closure(R):
+    """
+    Reflexive and transitive closure of the boolean relation R by repeated squaring
+    """
+    closure = R | np.eye(R.shape[0], dtype=bool)
+    while True:
+        squared = _product(closure, closure)
+        if (squared == closure).all():
+            return closure
+        closure = squared
+
+
+def _mask(row):
+    mask = 0
+    for i in np.flatnonzero(row):
+        mask |= 1 << int(i)
+    return mask
+
+
+def _body_matrix(F):
+    """
+    B[p, Y] number of occurrences of the symbol Y in the body of the production p
+    """
+    B = np.zeros((len(F.Productions), len(F.symbols)), dtype=np.float32)
+    bodies, offsets = F.bodies, F.offsets
+    for p in range(len(F.Productions)):
+        for i in range(offsets[p], offsets[p + 1]):
+            B[p, bodies[i]] += 1
+    return B
+
+
+def _head_matrix(F):
+    """
+    H[p, X] is True if X is the head of the production p
+    """
+    H = np.zeros((len(F.Productions), len(F.symbols)), dtype=bool)
+    H[np.arange(len(F.Productions)), np.asarray(F.heads, dtype=np.intp)] = True
+    return H
+
+
+def _derivable(F, B, known):
+    """
+    Fixpoint of `known |= heads of the productions whose body symbols are all known`
+    :param B: body matrix of F
+    :param known: initial boolean vector over the symbols
+    """
+    heads = np.asarray(F.heads, dtype=np.intp)
+    while True:
+        ready = (B @ (~known).astype(np.float32)) == 0
+        updated = known.copy()
+        updated[heads[ready]] = True
+        if (updated == known).all():
+            return known
+        known = updated
+
+
+def compute_nullable_matrix(F):
+    """
+    Nullable symbols of a FrozenGrammar as a boolean vector indexed by symbol id
+    """
+    return _derivable(F, _body_matrix(F), np.zeros(len(F.symbols), dtype=bool))
+
+
+def _prefix_relations(F, nullable):
+    """
+    BW[p, Y] if the production p is X -> alpha Y beta with alpha ->* epsilon
+    """
+    BW = np.zeros((len(F.Productions), len(F.symbols)), dtype=bool)
+    bodies, offsets = F.bodies, F.offsets
+    for p in range(len(F.Productions)):
+        for i in range(offsets[p], offsets[p + 1]):
+            BW[p, bodies[i]] = True
+            if not nullable[bodies[i]]:
+                break
+    return BW
+
+
+def compute_firsts_matrix(G, container=ContainerSet):
+    """
+    Same result as compute_firsts, computed with boolean matrices: FIRST is the closure of
+    the begins-with relation restricted to the terminals
+    """
+    F = G.freeze()
+    nullable = compute_nullable_matrix(F)
+
+    # X begins-with Y if X -> alpha Y beta with alpha ->* epsilon
+    BW = _prefix_relations(F, nullable)
+    begins_with = _product(_head_matrix(F).T, BW)
+    closure = transitive_closure(begins_with)
+
+    terminal = np.zeros(len(F.symbols), dtype=bool)
+    terminal[1:F.terminal_count] = True
+    first = closure & terminal
+    body_first = _product(BW, first)
+
+    build = container_builder(F, container)
+    symbols = F.symbols
+    firsts = {}
+    for X in range(1, len(symbols)):
+        firsts[symbols[X]] = build(_mask(first[X]), bool(nullable[X]))
+
+    B = _body_matrix(F)
+    body_nullable = (B @ (~nullable).astype(np.float32)) == 0
+    for p, production in enumerate(F.Productions):
+        if production.Right not in firsts:
+            firsts[production.Right] = build(_mask(body_first[p]), bool(body_nullable[p]))
+
+    return firsts
+
+
+def compute_follows_matrix(G, firsts, container=ContainerSet):
+    """
+    Same result as compute_follows, computed with boolean matrices: FOLLOW is the closure of the
+    includes relation applied to the FIRST sets of the followed-by relation
+    """
+    F = G.freeze()
+    n = len(F.symbols)
+    ids = F.ids
+
+    first = np.zeros((n, n), dtype=bool)
+    nullable = np.zeros(n, dtype=bool)
+    first[0, 0] = True
+    for Y in range(1, n):
+        first_Y = firsts[F.symbols[Y]]
+        first[Y, [ids[t] for t in first_Y]] = True
+        nullable[Y] = first_Y.contains_epsilon
+
+    # Y followed-by Z if X -> alpha Y beta Z gamma with beta ->* epsilon
+    # Y includes X if X -> alpha Y beta with beta ->* epsilon
+    followed_by = np.zeros((n, n), dtype=bool)
+    includes = np.zeros((n, n), dtype=bool)
+    heads, bodies, offsets = F.heads, F.bodies, F.offsets
+    for p in range(len(F.Productions)):
+        X = heads[p]
+        following = []
+        nullable_beta = True
+        for i in range(offsets[p + 1] - 1, offsets[p] - 1, -1):
+            Y = bodies[i]
+            if not F.is_terminal[Y]:
+                followed_by[Y, following] = True
+                if nullable_beta and Y != X:
+                    includes[Y, X] = True
+            if nullable[Y]:
+                following.append(Y)
+            else:
+                following = [Y]
+                nullable_beta = False
+    seed = _product(followed_by, first)
+    if F.start >= 0:
+        seed[F.start, 0] = True
+
+    follow = _product(transitive_closure(includes), seed)
+
+    build = container_builder(F, container)
+    symbols = F.symbols
+    return {symbols[X]: build(_mask(follow[X])) for X in range(F.terminal_count, n)}
+
+
+def compute_productive_matrix(G):
+    """
+    Non terminals of G that derive a string of terminals
+    """
+    F = G.freeze()
+    known = np.zeros(len(F.symbols), dtype=bool)
+    known[:F.terminal_count] = True
+    productive = _derivable(F, _body_matrix(F), known)
+    return {F.symbols[X] for X in np.flatnonzero(productive[F.terminal_count:]) + F.terminal_count}
+
+
+def compute_reachable_matrix(G):
+    """
+    Symbols of G reachable from the start symbol
+    """
+    F = G.freeze()
+    if F.start < 0:
+        return set()
+
+    # X derives-in-one-step Y if Y occurs in the body of a production of X
+    step = _product(_head_matrix(F).T, _body_matrix(F) > 0)
+    reachable = np.zeros(len(F.symbols), dtype=bool)
+    reachable[F.start] = True
+    while True:
+        updated = reachable | _product(reachable[None, :], step)[0]
+        if (updated == reachable).all():
+            return {F.symbols[X] for X in np.flatnonzero(reachable)}
+        reachable = updated
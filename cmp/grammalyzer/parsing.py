@@ -1,7 +1,11 @@
 from enum import auto, Enum
 
-from .automatas import build_lr0_automaton, build_lr1_automaton, build_larl1_automaton
-from .utils import compute_firsts, compute_follows
+from cmp.utils import ContainerSet
+
+from .automatas import (build_lr0_automaton, build_lr1_automaton, build_lr1_automaton_parallel, build_lalr1_automaton,
+                        build_minimal_lr1_automaton, closure_templates)
+from .utils import (compute_firsts, compute_firsts_k, compute_follows, compute_follows_k, concat_k, first_cache,
+                    firsts_and_follows)
 
 
 class LRConflictType(Enum):
@@ -43,10 +47,10 @@ class LLConflict:
 
 
 class LL1Parser:
-    def __init__(self, G):
+    def __init__(self, G, container=ContainerSet):
         self.G = G
-        self.firsts = compute_firsts(G)
-        self.follows = compute_follows(G, self.firsts)
+        self.firsts = compute_firsts(G, container)
+        self.follows = compute_follows(G, self.firsts, container)
         self.conflict = None
         self.table = self._build_parsing_table()
 
@@ -115,21 +119,122 @@ class LL1Parser:
         return output
 
 
+class LLkParser(LL1Parser):
+    """
+    Strong LL(k) parser.
+
+    FIRST_k and FOLLOW_k are sets of interned k-tuples of symbol ids (`firsts_k` and `follows_k`,
+    indexed by symbol id) and the prediction table maps (X, tuple of the next k terminals) to the
+    productions of X. `firsts` and `follows` are the k=1 sets, as in LL1Parser.
+    """
+
+    def __init__(self, G, k=2, container=ContainerSet):
+        self.k = k
+        self.firsts_k = self.follows_k = None
+        super().__init__(G, container)
+
+    def _build_parsing_table(self):
+        G = self.G
+        F = G.freeze()
+        k = self.k
+        interned = {}
+        self.firsts_k, body_firsts = compute_firsts_k(G, k, interned)
+        self.follows_k = compute_follows_k(G, self.firsts_k, k, interned)
+        lookaheads = {}
+        parsing_table = {}
+
+        # P: X -> alpha
+        for p, production in enumerate(F.Productions):
+            head = production.Left
+            first_alpha = body_firsts[p]
+
+            # First_k(alpha Follow_k(X))
+            for w in concat_k(first_alpha, self.follows_k[F.ids[head]], k, interned):
+                try:
+                    lookahead = lookaheads[w]
+                except KeyError:
+                    lookahead = lookaheads[w] = tuple(F.symbols[i] for i in w)
+
+                try:
+                    parsing_table[head, lookahead].append(production)
+                    if w in first_alpha:
+                        self.conflict = LLConflict(head, lookahead, LLConflictType.FirstFirst)
+                    else:
+                        self.conflict = LLConflict(head, lookahead, LLConflictType.FollowFollow)
+                except KeyError:
+                    parsing_table[head, lookahead] = [production]
+
+        # parsing table is ready!!!
+        return parsing_table
+
+    def _lookahead(self, tokens, cursor):
+        lookahead = []
+        for token in tokens[cursor:cursor + self.k]:
+            lookahead.append(token.token_type)
+            if token.token_type == self.G.EOF:
+                break
+        return tuple(lookahead)
+
+    def __call__(self, tokens):
+        G = self.G
+        table = self.table
+
+        stack = [G.startSymbol]
+        cursor = 0
+        output = []
+
+        # parsing w...
+        while len(stack) > 0 and cursor < len(tokens):
+            top = stack.pop()
+            if top.IsTerminal:
+                if tokens[cursor].token_type != top:
+                    return None
+                cursor += 1
+            elif top.IsNonTerminal:
+                try:
+                    production = table[top, self._lookahead(tokens, cursor)][0]
+                except KeyError:
+                    return None
+
+                output.append(production)
+                for s in reversed(production.Right):
+                    stack.append(s)
+
+        # left parse is ready!!!
+        return output
+
+
 class ShiftReduceParser:
+    """
+    `max_states`, `max_items` and `deadline` bound the construction of the automaton, the builder
+    raises AutomatonBudgetExceeded when one of them is exceeded.
+
+    `previous` is the automaton of a parser of an earlier version of G, the SLR(1) and LALR(1)
+    parsers only rebuild the states the edits of the grammar can change and take the others from it.
+    `update()` rebuilds the parser that way after G is edited.
+    """
     SHIFT = 'SHIFT'
     REDUCE = 'REDUCE'
     OK = 'OK'
 
-    def __init__(self, G, verbose=False):
+    def __init__(self, G, verbose=False, container=ContainerSet, max_states=None, max_items=None, deadline=None,
+                 previous=None):
         self.G = G
-        self.augmented_G = G.AugmentedGrammar(True)
-        self.firsts = compute_firsts(self.augmented_G)
-        self.follows = compute_follows(self.augmented_G, self.firsts)
-        self.automaton = self._build_automaton()
+        self.container = container
+        self.limits = {'max_states': max_states, 'max_items': max_items, 'deadline': deadline}
+        self.verbose = verbose
+        self._build(previous)
+
+    def _build(self, previous=None):
+        container = self.container
+        self.augmented_G = self.G.AugmentedGrammar(True)
+        self.firsts, self.follows = firsts_and_follows(self.augmented_G, container)
+        self.first_cache = first_cache(self.augmented_G, container)
+        self.templates = closure_templates(self.augmented_G, container)
+        self.automaton = self._build_automaton(previous)
         self.state_dict = {}
         self.conflict = None
 
-        self.verbose = verbose
         self.action = {}
         self.goto = {}
         self._build_parsing_table()
@@ -137,32 +242,36 @@ class ShiftReduceParser:
         if self.conflict is None:
             self._clean_tables()
 
+    def update(self):
+        """
+        Rebuild the automaton and the tables after G was edited, reusing the states of the current automaton
+        """
+        self._build(self.automaton)
+
     def _build_parsing_table(self):
         G = self.augmented_G
+        symbols = G.freeze().symbols
         automaton = self.automaton
 
-        for i, node in enumerate(automaton):
+        for node in automaton:
             if self.verbose:
-                print(i, '\t', '\n\t '.join(str(x) for x in node.state), '\n')
-            node.idx = i
-            self.state_dict[i] = node
+                print(node.idx, '\t', '\n\t '.join(str(x) for x in node.state), '\n')
+            self.state_dict[node.idx] = node
 
-        for node in automaton:
-            idx = node.idx
-            for item in node.state:
-                if item.IsReduceItem:
-                    if item.production.Left == G.startSymbol:
-                        self._register(self.action, (idx, G.EOF), (self.OK, None))
-                    else:
-                        for lookahead in self._lookaheads(item):
-                            self._register(self.action, (idx, lookahead), (self.REDUCE, item.production))
+        for idx in range(len(automaton)):
+            for item in automaton.reduce_items(idx):
+                if item.production.Left == G.startSymbol:
+                    self._register(self.action, (idx, G.EOF), (self.OK, None))
                 else:
-                    symbol = item.NextSymbol
-                    idj = node.get(symbol.Name).idx
-                    if symbol.IsTerminal:
-                        self._register(self.action, (idx, symbol), (self.SHIFT, idj))
-                    else:
-                        self._register(self.goto, (idx, symbol), idj)
+                    for lookahead in self._lookaheads(item):
+                        self._register(self.action, (idx, lookahead), (self.REDUCE, item.production))
+
+            for symbol, idj in automaton.transitions(idx):
+                symbol = symbols[symbol]
+                if symbol.IsTerminal:
+                    self._register(self.action, (idx, symbol), (self.SHIFT, idj))
+                else:
+                    self._register(self.goto, (idx, symbol), idj)
 
     def __call__(self, tokens, get_ast=False):
         stack = [0]
@@ -232,7 +341,7 @@ class ShiftReduceParser:
         for key in self.goto:
             self.goto[key] = self.goto[key].pop()
 
-    def _build_automaton(self):
+    def _build_automaton(self, previous=None):
         raise NotImplementedError()
 
     def _lookaheads(self, item):
@@ -240,21 +349,46 @@ class ShiftReduceParser:
 
 
 class SLR1Parser(ShiftReduceParser):
-    def _build_automaton(self):
-        return build_lr0_automaton(self.augmented_G)
+    def _build_automaton(self, previous=None):
+        return build_lr0_automaton(self.augmented_G, self.templates, previous=previous, **self.limits)
 
     def _lookaheads(self, item):
         return self.follows[item.production.Left]
 
 
 class LR1Parser(ShiftReduceParser):
-    def _build_automaton(self):
-        return build_lr1_automaton(self.augmented_G, firsts=self.firsts)
+    """
+    Canonical LR(1) parser, with `workers` the automaton is built in a pool of that many processes.
+    Its automaton is always built from scratch, `previous` is ignored.
+    """
+
+    def __init__(self, G, verbose=False, container=ContainerSet, workers=None, max_states=None, max_items=None,
+                 deadline=None, previous=None):
+        self.workers = workers
+        super().__init__(G, verbose, container, max_states, max_items, deadline, previous)
+
+    def _build_automaton(self, previous=None):
+        if self.workers:
+            return build_lr1_automaton_parallel(self.augmented_G, self.workers, templates=self.templates,
+                                                **self.limits)
+        return build_lr1_automaton(self.augmented_G, firsts=self.firsts, cache=self.first_cache,
+                                   templates=self.templates, **self.limits)
 
     def _lookaheads(self, item):
         return item.lookaheads
 
 
+class MinimalLR1Parser(LR1Parser):
+    """
+    LR(1) parser whose automaton merges the LR(1) states that are weakly compatible (Pager),
+    it has the power of LR(1) with about as many states as LALR(1)
+    """
+
+    def _build_automaton(self, previous=None):
+        return build_minimal_lr1_automaton(self.augmented_G, firsts=self.firsts, cache=self.first_cache,
+                                           templates=self.templates, **self.limits)
+
+
 class LALR1Parser(LR1Parser):
-    def _build_automaton(self):
-        return build_larl1_automaton(self.augmented_G, firsts=self.firsts)
+    def _build_automaton(self, previous=None):
+        return build_lalr1_automaton(self.augmented_G, self.templates, previous=previous, **self.limits)
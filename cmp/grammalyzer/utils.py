@@ -1,93 +1,595 @@
-from cmp.utils import ContainerSet
+from collections import OrderedDict
+
+from cmp.pycompiler import SentenceView, Symbol
+from cmp.utils import BitContainerSet, ContainerSet, bits
 
 
 def compute_local_first(firsts, alpha):
-    first_alpha = ContainerSet()
+    """
+    FIRST of the sentence `alpha`, a Sentence or a SentenceView. Use a FirstCache to memoize
+    the FIRST of production suffixes.
+    """
+    first_alpha = None
 
     try:
         alpha_is_epsilon = alpha.IsEpsilon
     except AttributeError:
         alpha_is_epsilon = False
 
-    if alpha_is_epsilon:
-        first_alpha.set_epsilon()
-    else:
+    if not alpha_is_epsilon:
         for symbol in alpha:
             first_symbol = firsts[symbol]
-            first_alpha.update(first_symbol)
+            # the result is a set of the same type as the FIRST sets
+            if first_alpha is None:
+                first_alpha = first_symbol.copy()
+                first_alpha.set_epsilon(False)
+            else:
+                first_alpha.update(first_symbol)
             if not first_symbol.contains_epsilon:
-                break
-        else:
-            first_alpha.set_epsilon()
+                return first_alpha
 
+    if first_alpha is None:
+        first_alpha = empty_first(firsts)
+    first_alpha.set_epsilon()
     return first_alpha
 
 
-def compute_firsts(G):
-    firsts = {}
-    change = True
+def empty_first(firsts):
+    """
+    Empty set of the type of the FIRST sets in `firsts`, over the same universe for BitContainerSet
+    """
+    for first in firsts.values():
+        if isinstance(first, BitContainerSet):
+            return BitContainerSet(universe=first.universe)
+        break
+    return ContainerSet()
 
-    for terminal in G.terminals:
-        firsts[terminal] = ContainerSet(terminal)
 
-    for nonterminal in G.nonTerminals:
-        firsts[nonterminal] = ContainerSet()
+class FirstCache:
+    """
+    Bounded LRU cache of the FIRST sets of production suffixes.
 
-    while change:
-        change = False
+    `cache(production, offset)` is FIRST(beta) for the suffix beta of the production body that
+    starts at `offset`, and `cache(production, offset, a)` is FIRST(beta a). Entries are evicted in
+    least recently used order once `maxsize` is reached. `hits` and `misses` count the lookups.
+    """
+
+    def __init__(self, firsts, maxsize=1 << 16):
+        self.firsts = firsts
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, production, offset, lookahead=None):
+        key = (production, offset, lookahead)
+        entries = self.entries
+        try:
+            value = entries[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            entries.move_to_end(key)
+            return value
+
+        if lookahead is None:
+            value = compute_local_first(self.firsts, SentenceView(production, offset))
+        else:
+            value = self(production, offset)
+            if value.contains_epsilon:
+                value = value.copy()
+                value.set_epsilon(False)
+                value.add(lookahead)
+
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return f'FirstCache({len(self.entries)}/{self.maxsize} entries, {self.hits} hits, {self.misses} misses)'
+
+    def __repr__(self):
+        return str(self)
+
+
+def strongly_connected_components(nodes, successors):
+    """
+    Tarjan's algorithm without recursion.
+    :param nodes: iterable of nodes
+    :param successors: successors[v] are the nodes v depends on
+    :return: list of components, every component comes after the components it depends on
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+
+        while work:
+            v, edges = work[-1]
+            for w in edges:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(successors[w])))
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+
+    return components
 
-        # P: X -> alpha
-        for production in G.Productions:
-            X, alpha = production
 
-            first_X = firsts[X]
+def propagate(components, base, successors):
+    """
+    Value of every node as the union of its base value and the values of its successors,
+    computed once per component.
+    :param components: components of the graph as returned by strongly_connected_components
+    :param base: base[v] initial set of v as an int bitmask
+    :param successors: successors[v] are the nodes whose value is included in the value of v
+    :return: list of int bitmasks indexed by node
+    """
+    value = [0] * len(base)
+    for component in components:
+        if len(component) == 1:
+            v = component[0]
+            current = base[v]
+            for w in successors[v]:
+                current |= value[w]
+        else:
+            members = set(component)
+            current = 0
+            for v in component:
+                current |= base[v]
+                for w in successors[v]:
+                    if w not in members:
+                        current |= value[w]
+        for v in component:
+            value[v] = current
+    return value
+
+
+def compute_nullable(F):
+    """
+    Nullable symbols of a FrozenGrammar as a bytearray indexed by symbol id
+    """
+    heads, bodies, offsets = F.heads, F.bodies, F.offsets
+    nullable = bytearray(len(F.symbols))
+
+    # pending[p] -> symbols of the body of p not yet known to be nullable
+    pending = [offsets[p + 1] - offsets[p] for p in range(len(F.Productions))]
+    occurrences = [[] for _ in F.symbols]
+    worklist = []
+    for p in range(len(F.Productions)):
+        if not pending[p]:
+            worklist.append(heads[p])
+        for i in range(offsets[p], offsets[p + 1]):
+            if not F.is_terminal[bodies[i]]:
+                occurrences[bodies[i]].append(p)
+
+    while worklist:
+        X = worklist.pop()
+        if nullable[X]:
+            continue
+        nullable[X] = 1
+        for p in occurrences[X]:
+            pending[p] -= 1
+            if not pending[p] and not nullable[heads[p]]:
+                worklist.append(heads[p])
+
+    return nullable
+
 
-            try:
-                first_alpha = firsts[alpha]
-            except KeyError:
-                first_alpha = firsts[alpha] = ContainerSet()
+def container_builder(F, container=ContainerSet):
+    """
+    Function that turns an int bitmask over the symbol ids of the FrozenGrammar F into a `container`
+    :param container: ContainerSet or BitContainerSet
+    """
+    if container is BitContainerSet:
+        return lambda mask, epsilon=False: BitContainerSet.from_mask(F, mask, epsilon)
 
-            local_first = compute_local_first(firsts, alpha)
+    symbols = F.symbols
+    return lambda mask, epsilon=False: container(*(symbols[i] for i in bits(mask)), contains_epsilon=epsilon)
 
-            change |= first_alpha.hard_update(local_first)
-            change |= first_X.hard_update(local_first)
+
+def compute_firsts(G, container=ContainerSet):
+    F = G.freeze()
+    heads, bodies, offsets = F.heads, F.bodies, F.offsets
+    is_terminal = F.is_terminal
+    nullable = compute_nullable(F)
+
+    # X -> alpha Y beta with alpha ->* epsilon: First(Y) subset of First(X)
+    base = [0] * len(F.symbols)
+    depends = [set() for _ in F.symbols]
+    for p in range(len(F.Productions)):
+        X = heads[p]
+        for i in range(offsets[p], offsets[p + 1]):
+            Y = bodies[i]
+            if is_terminal[Y]:
+                base[X] |= 1 << Y
+                break
+            depends[X].add(Y)
+            if not nullable[Y]:
+                break
+
+    components = strongly_connected_components(range(F.terminal_count, len(F.symbols)), depends)
+    values = propagate(components, base, depends)
+
+    build = container_builder(F, container)
+    symbols = F.symbols
+    firsts = {}
+    for t in range(1, F.terminal_count):
+        firsts[symbols[t]] = build(1 << t)
+    for X in range(F.terminal_count, len(symbols)):
+        firsts[symbols[X]] = build(values[X], bool(nullable[X]))
+
+    # First(alpha) of every production body
+    for p, production in enumerate(F.Productions):
+        if production.Right in firsts:
+            continue
+        mask = 0
+        for i in range(offsets[p], offsets[p + 1]):
+            Y = bodies[i]
+            mask |= 1 << Y if is_terminal[Y] else values[Y]
+            if not nullable[Y]:
+                firsts[production.Right] = build(mask)
+                break
+        else:
+            firsts[production.Right] = build(mask, True)
 
     return firsts
 
 
-def compute_follows(G, firsts):
-    follows = {}
-    change = True
+def compute_follows(G, firsts, container=ContainerSet):
+    F = G.freeze()
+    heads, bodies, offsets = F.heads, F.bodies, F.offsets
+    is_terminal, ids = F.is_terminal, F.ids
 
-    local_firsts = {}
+    # First sets by symbol id
+    symbol_firsts = [1]
+    nullable = bytearray(len(F.symbols))
+    for Y, symbol in enumerate(F.symbols[1:], 1):
+        first = firsts[symbol]
+        if isinstance(first, BitContainerSet) and first.universe is F:
+            symbol_firsts.append(first.mask)
+        else:
+            mask = 0
+            for t in first:
+                mask |= 1 << ids[t]
+            symbol_firsts.append(mask)
+        nullable[Y] = first.contains_epsilon
 
     # init Follow(Vn)
-    for nonterminal in G.nonTerminals:
-        follows[nonterminal] = ContainerSet()
-    follows[G.startSymbol] = ContainerSet(G.EOF)
+    base = [0] * len(F.symbols)
+    if F.start >= 0:
+        base[F.start] = 1
+
+    # includes[Y] -> every X such that Follow(X) is subset of Follow(Y)
+    includes = [set() for _ in F.symbols]
+
+    # P: X -> alpha, walked from right to left keeping First(beta) of the suffix
+    for p in range(len(F.Productions)):
+        X = heads[p]
+        first_beta = 0
+        nullable_beta = True
+        for i in range(offsets[p + 1] - 1, offsets[p] - 1, -1):
+            # X -> zeta Y beta
+            Y = bodies[i]
+            if not is_terminal[Y]:
+                # First(beta) - { epsilon } subset of Follow(Y)
+                base[Y] |= first_beta
+                # beta ->* epsilon ? Follow(X) subset of Follow(Y)
+                if nullable_beta and Y != X:
+                    includes[Y].add(X)
+            if nullable[Y]:
+                first_beta |= symbol_firsts[Y]
+            else:
+                first_beta = symbol_firsts[Y]
+                nullable_beta = False
+
+    components = strongly_connected_components(range(F.terminal_count, len(F.symbols)), includes)
+    values = propagate(components, base, includes)
+
+    # Follow(Vn)
+    build = container_builder(F, container)
+    symbols = F.symbols
+    return {symbols[X]: build(values[X]) for X in range(F.terminal_count, len(symbols))}
+
 
+def concat_k(left, right, k, interned):
+    """
+    k-prefixes of the concatenations of the strings in `left` and in `right`.
+    Strings are tuples of symbol ids, every new tuple is interned in the `interned` dict.
+    """
+    result = set()
+    for x in left:
+        if len(x) >= k:
+            result.add(x)
+            continue
+        for y in right:
+            z = (x + y)[:k]
+            result.add(interned.setdefault(z, z))
+    return result
+
+
+def compute_firsts_k(G, k, interned=None):
+    """
+    FIRST_k sets of G as sets of interned k-tuples of symbol ids, shorter tuples are whole sentences
+    :return: (list indexed by symbol id, list indexed by production id)
+    """
+    F = G.freeze()
+    heads, bodies, offsets = F.heads, F.bodies, F.offsets
+    if interned is None:
+        interned = {}
+
+    firsts = [set() for _ in F.symbols]
+    for t in range(F.terminal_count):
+        firsts[t].add(interned.setdefault((t,), (t,)))
+    body_firsts = [set() for _ in F.Productions]
+
+    change = True
     while change:
         change = False
-
         # P: X -> alpha
-        for production in G.Productions:
-            X = production.Left
-            alpha = production.Right
-
-            follow_X = follows[X]
-
-            for i, symbol_Y in enumerate(alpha):
-                # X -> zeta Y beta
-                if symbol_Y.IsNonTerminal:
-                    follow_Y = follows[symbol_Y]
-                    try:
-                        first_beta = local_firsts[alpha, i]
-                    except KeyError:
-                        first_beta = local_firsts[alpha, i] = compute_local_first(firsts, alpha[i + 1:])
-                    # First(beta) - { epsilon } subset of Follow(Y)
-                    change |= follow_Y.update(first_beta)
-                    # beta ->* epsilon or X -> zeta Y ? Follow(X) subset of Follow(Y)
-                    if first_beta.contains_epsilon:
-                        change |= follow_Y.update(follow_X)
-    # Follow(Vn)
+        for p in range(len(F.Productions)):
+            local_first = {()}
+            for i in range(offsets[p], offsets[p + 1]):
+                local_first = concat_k(local_first, firsts[bodies[i]], k, interned)
+                if not local_first:
+                    break
+
+            first_X = firsts[heads[p]]
+            n = len(first_X)
+            first_X |= local_first
+            body_firsts[p] = local_first
+            change |= n != len(first_X)
+
+    return firsts, body_firsts
+
+
+def compute_follows_k(G, firsts, k, interned=None):
+    """
+    FOLLOW_k sets of G as sets of interned k-tuples of symbol ids, tuples ending with EOF are shorter than k
+    :param firsts: FIRST_k sets indexed by symbol id
+    :return: list indexed by symbol id
+    """
+    F = G.freeze()
+    heads, bodies, offsets = F.heads, F.bodies, F.offsets
+    if interned is None:
+        interned = {}
+
+    follows = [set() for _ in F.symbols]
+    if F.start >= 0:
+        follows[F.start].add(interned.setdefault((0,), (0,)))
+
+    change = True
+    while change:
+        change = False
+        # P: X -> alpha, walked from right to left keeping First_k(beta)
+        for p in range(len(F.Productions)):
+            X = heads[p]
+            first_beta = {()}
+            for i in range(offsets[p + 1] - 1, offsets[p] - 1, -1):
+                # X -> zeta Y beta: First_k(beta Follow_k(X)) subset of Follow_k(Y)
+                Y = bodies[i]
+                if not F.is_terminal[Y]:
+                    follow_Y = follows[Y]
+                    n = len(follow_Y)
+                    follow_Y |= concat_k(first_beta, follows[X], k, interned)
+                    change |= n != len(follow_Y)
+                first_beta = concat_k(firsts[Y], first_beta, k, interned)
+
     return follows
+
+
+def firsts_and_follows(G, container=ContainerSet):
+    """
+    FIRST and FOLLOW sets of G, memoized until G changes so every parser built
+    for the same grammar shares them
+    :param container: ContainerSet or BitContainerSet, the type of the sets
+    """
+    return G.memo(('firsts_and_follows', container), lambda grammar: _compute_firsts_follows(grammar, container))
+
+
+def first_cache(G, container=ContainerSet):
+    """
+    FirstCache over the memoized FIRST sets of G, shared by every parser built for the same grammar
+    """
+    return G.memo(('first_cache', container),
+                  lambda grammar: FirstCache(firsts_and_follows(grammar, container)[0]))
+
+
+def _compute_firsts_follows(G, container):
+    firsts = compute_firsts(G, container)
+    return firsts, compute_follows(G, firsts, container)
+
+class IncrementalFirstsFollows:
+    """
+    FIRST and FOLLOW sets of a grammar that are kept up to date while the grammar is edited.
+
+    The instance listens to the grammar, so productions added with `%=` or removed by the cleaner
+    transforms are recorded and the sets are refreshed the next time `firsts` or `follows` is read.
+    When productions were only added the new elements are propagated from the changed heads.
+    When a production was removed, only the region of the dependency graph that can reach the
+    changed heads is cleared and recomputed, every other set is kept.
+    """
+
+    def __init__(self, G):
+        self.G = G
+        self._firsts = compute_firsts(G)
+        self._follows = compute_follows(G, self._firsts)
+        self.bodies = {}
+        for production in G.Productions:
+            self.bodies[production.Right] = self.bodies.get(production.Right, 0) + 1
+
+        self.added = []
+        self.removed = []
+        G.listeners.append(self)
+
+    def on_add(self, value):
+        if isinstance(value, Symbol):
+            if value.IsTerminal:
+                self._firsts[value] = ContainerSet(value)
+            else:
+                self._firsts[value] = ContainerSet()
+                self._follows[value] = ContainerSet()
+        else:
+            self.added.append(value)
+
+    def on_remove(self, value):
+        if isinstance(value, Symbol):
+            self._firsts.pop(value, None)
+            self._follows.pop(value, None)
+        else:
+            self.removed.append(value)
+
+    def detach(self):
+        self.G.listeners.remove(self)
+
+    @property
+    def firsts(self):
+        self.refresh()
+        return self._firsts
+
+    @property
+    def follows(self):
+        self.refresh()
+        return self._follows
+
+    def refresh(self):
+        if not self.added and not self.removed:
+            return
+
+        G = self.G
+        firsts = self._firsts
+        added, removed = self.added, self.removed
+        self.added, self.removed = [], []
+        shrink = bool(removed)
+
+        # FIRST: with removals every set that can reach a changed head is cleared,
+        # with additions only the changed heads are seeds
+        heads = {production.Left for production in added + removed if production.Left in firsts}
+        region = self._dependents(heads) if shrink else heads
+
+        previous = {}
+        for X in region:
+            previous[X] = set(firsts[X]), firsts[X].contains_epsilon
+            if shrink:
+                firsts[X] = ContainerSet()
+
+        pending = list(region)
+        while pending:
+            X = pending.pop()
+            local_first = ContainerSet()
+            for _, body in G.headIndex.get(X, []):
+                local_first.hard_update(compute_local_first(firsts, body))
+            if X not in previous:
+                previous[X] = set(firsts[X]), firsts[X].contains_epsilon
+            if firsts[X].hard_update(local_first):
+                pending.extend(production.Left for production, _ in G.occurrenceIndex.get(X, []))
+
+        changed = {X for X, (first, epsilon) in previous.items()
+                   if set(firsts[X]) != first or firsts[X].contains_epsilon != epsilon}
+
+        # FIRST of the production bodies
+        for production in added:
+            self.bodies[production.Right] = self.bodies.get(production.Right, 0) + 1
+            firsts[production.Right] = compute_local_first(firsts, production.Right)
+        for production in removed:
+            self.bodies[production.Right] -= 1
+            if not self.bodies[production.Right]:
+                del self.bodies[production.Right]
+                firsts.pop(production.Right, None)
+        for X in changed:
+            for production, _ in G.occurrenceIndex.get(X, []):
+                firsts[production.Right] = compute_local_first(firsts, production.Right)
+
+        self._refresh_follows(added, removed, changed, shrink)
+
+    def _dependents(self, symbols):
+        """
+        Symbols whose FIRST set depends on some of the given symbols
+        """
+        region = set(symbols)
+        pending = list(symbols)
+        while pending:
+            X = pending.pop()
+            for production, _ in self.G.occurrenceIndex.get(X, []):
+                if production.Left not in region:
+                    region.add(production.Left)
+                    pending.append(production.Left)
+        return region
+
+    def _refresh_follows(self, added, removed, changed, shrink):
+        G = self.G
+        firsts, follows = self._firsts, self._follows
+
+        # symbols whose FOLLOW may change: those in the edited bodies and those in front of a symbol
+        # whose FIRST changed
+        seeds = {symbol for production in added + removed for symbol in production.Right if symbol.IsNonTerminal}
+        for X in changed:
+            for production, i in G.occurrenceIndex.get(X, []):
+                seeds.update(symbol for symbol in production.Right[:i] if symbol.IsNonTerminal)
+        seeds = {Y for Y in seeds if Y in follows}
+
+        if shrink:
+            # every FOLLOW that includes the FOLLOW of a seed is recomputed from scratch
+            region = set(seeds)
+            pending = list(seeds)
+            while pending:
+                X = pending.pop()
+                for _, body in G.headIndex.get(X, []):
+                    for symbol in body:
+                        if symbol.IsNonTerminal and symbol not in region and symbol in follows:
+                            region.add(symbol)
+                            pending.append(symbol)
+            for Y in region:
+                follows[Y] = ContainerSet(G.EOF) if Y == G.startSymbol else ContainerSet()
+            seeds = region
+
+        pending = list(seeds)
+        while pending:
+            Y = pending.pop()
+            follow_Y = follows[Y]
+            change = False
+            for production, i in G.occurrenceIndex.get(Y, []):
+                first_beta = compute_local_first(firsts, SentenceView(production, i + 1))
+                change |= follow_Y.update(first_beta)
+                if first_beta.contains_epsilon:
+                    change |= follow_Y.update(follows[production.Left])
+            if change:
+                pending.extend(symbol for _, body in G.headIndex.get(Y, []) for symbol in body
+                               if symbol.IsNonTerminal and symbol in follows)
@@ -0,0 +1,41 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+# Pickled snapshots shared with worker processes. They are kept as bytes so a forked worker
+# reads them from the pages inherited from the parent instead of getting a private copy of
+# every object touched by the reference counting.
+SNAPSHOTS = {}
+_loaded = {}
+
+
+def share(key, value):
+    """
+    Store a pickled snapshot of `value` (a grammar, a parser, a lexer, ...) under `key`.
+    Processes forked after this call can load it with `shared(key)` without it being sent to them.
+    """
+    SNAPSHOTS[key] = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    _loaded.pop(key, None)
+
+
+def shared(key):
+    """
+    Load the snapshot stored under `key`, it is unpickled once per process
+    """
+    try:
+        return _loaded[key]
+    except KeyError:
+        value = _loaded[key] = pickle.loads(SNAPSHOTS[key])
+        return value
+
+
+def process_pool(workers=None, initializer=None, initargs=()):
+    """
+    ProcessPoolExecutor whose workers are forked when the platform allows it, so they inherit
+    the snapshots stored with `share`
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializer, initargs=initargs)
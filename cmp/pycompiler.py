@@ -1,4 +1,9 @@
+import hashlib
 import json
+import pickle
+import weakref
+from array import array
+from itertools import islice
 
 
 class Symbol(object):
@@ -36,9 +41,13 @@ class Symbol(object):
 
 class NonTerminal(Symbol):
 
-    def __init__(self, name, grammar):
-        super().__init__(name, grammar)
-        self.productions = []
+    @property
+    def productions(self):
+        """
+        Productions of the non terminal in the grammar that created it. A copy of that grammar that
+        changes them keeps its own list in its `headIndex`
+        """
+        return self.Grammar.headIndex.get(self, [])
 
     def __imod__(self, other):
 
@@ -165,6 +174,43 @@ class Sentence:
         return False
 
 
+class SentenceView:
+    """
+    Suffix `production.Right[offset:]` of the body of a production, seen without copying the symbols.
+    Views are equal when they point to the same production and offset, so they can key memoized results.
+    """
+    __slots__ = ('production', 'offset')
+
+    def __init__(self, production, offset):
+        self.production = production
+        self.offset = offset
+
+    def __len__(self):
+        return max(len(self.production.Right) - self.offset, 0)
+
+    def __iter__(self):
+        return islice(self.production.Right, self.offset, None)
+
+    def __getitem__(self, index):
+        return self.production.Right[self.offset + index]
+
+    def __eq__(self, other):
+        return isinstance(other, SentenceView) and self.offset == other.offset and self.production == other.production
+
+    def __hash__(self):
+        return hash((self.production, self.offset))
+
+    def __str__(self):
+        return ("%s " * len(self) % tuple(self)).strip()
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def IsEpsilon(self):
+        return False
+
+
 class SentenceList:
 
     def __init__(self, *args):
@@ -246,6 +292,61 @@ class Production:
         return self.Right.IsEpsilon
 
 
+# Semantic actions registered by name, see `action`
+ACTIONS = {}
+ACTION_NAMES = {}
+
+
+def action(name):
+    """
+    Register a semantic action under `name`. Attributed productions are pickled with the names of their
+    registered actions, so actions that are not importable (e.g. lambdas) can still be sent to other
+    processes as long as the worker registers them too.
+
+    >>> E %= E + plus + T, action('add')(lambda s: s[1] + s[3])
+    """
+
+    def decorate(func):
+        ACTIONS[name] = func
+        ACTION_NAMES[func] = name
+        return func
+
+    return decorate
+
+
+def action_reference(func):
+    if func is None:
+        return None
+    try:
+        return ActionReference(ACTION_NAMES[func])
+    except (KeyError, TypeError):
+        pass
+    if getattr(func, '__name__', '') == '<lambda>':
+        raise pickle.PicklingError(f'Semantic action {func} is not importable, register it with `action(name)`')
+    return func
+
+
+def resolve_action(value):
+    return ACTIONS[value.name] if isinstance(value, ActionReference) else value
+
+
+class ActionReference:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f'ActionReference({self.name!r})'
+
+
+def make_attribute_production(nonTerminal, sentence, attributes):
+    return AttributeProduction(nonTerminal, sentence, tuple(resolve_action(x) for x in attributes))
+
+
+@action('identity')
+def identity_action(s):
+    return s
+
+
 class AttributeProduction(Production):
 
     def __init__(self, nonTerminal, sentence, attributes):
@@ -255,6 +356,9 @@ class AttributeProduction(Production):
 
         self.attributes = attributes
 
+    def __reduce__(self):
+        return make_attribute_production, (self.Left, self.Right, [action_reference(x) for x in self.attributes])
+
     def __str__(self):
         return '%s := %s' % (self.Left, self.Right)
 
@@ -287,6 +391,27 @@ class Grammar:
 
         self.symbDict = {'$': self.EOF}
 
+        # production indexes
+        # headIndex[X] -> productions of X, `X.productions` for the non terminals created by this grammar
+        # leadingIndex[X] -> productions whose body starts with X
+        # occurrenceIndex[X] -> every (production, position) where X appears in a body
+        self.headIndex = {}
+        self.leadingIndex = {}
+        self.occurrenceIndex = {}
+
+        # every change to the symbols or productions increases the version and drops the cached values
+        self.version = 0
+        self.cache = {}
+        self.cacheKey = None
+
+        # objects notified with `on_add(x)` and `on_remove(x)` when a symbol or production is added or removed
+        self.listeners = []
+
+        # copy on write: containers (and index entries) listed here are shared with a copy of the grammar
+        # and are copied before their first write
+        self.shared = set()
+        self.sharedEntries = {'headIndex': set(), 'leadingIndex': set(), 'occurrenceIndex': set()}
+
     def NonTerminal(self, name, startSymbol=False):
 
         name = name.strip()
@@ -302,8 +427,11 @@ class Grammar:
             else:
                 raise Exception("Cannot define more than one start symbol.")
 
-        self.nonTerminals.append(term)
-        self.symbDict[name] = term
+        self.writable('nonTerminals').append(term)
+        self.writable('symbDict')[name] = term
+        self.version += 1
+        for listener in self.listeners:
+            listener.on_add(term)
         return term
 
     def NonTerminals(self, names):
@@ -319,8 +447,40 @@ class Grammar:
 
         assert type(production) == self.pType, "The Productions most be of only 1 type."
 
-        production.Left.productions.append(production)
-        self.Productions.append(production)
+        self.writable_entry('headIndex', production.Left).append(production)
+        self.writable('Productions').append(production)
+
+        for i, symbol in enumerate(production.Right):
+            self.writable_entry('occurrenceIndex', symbol).append((production, i))
+        if len(production.Right) > 0:
+            self.writable_entry('leadingIndex', production.Right[0]).append(production)
+        self.version += 1
+        for listener in self.listeners:
+            listener.on_add(production)
+
+    def Remove_Production(self, production):
+        self.writable_entry('headIndex', production.Left).remove(production)
+        self.writable('Productions').remove(production)
+
+        for i, symbol in enumerate(production.Right):
+            self.writable_entry('occurrenceIndex', symbol).remove((production, i))
+        if len(production.Right) > 0:
+            self.writable_entry('leadingIndex', production.Right[0]).remove(production)
+        self.version += 1
+        for listener in self.listeners:
+            listener.on_remove(production)
+
+    def Remove_Symbol(self, symbol):
+        if symbol.IsTerminal:
+            self.writable('terminals').remove(symbol)
+        else:
+            self.writable('nonTerminals').remove(symbol)
+
+        if self.symbDict.get(symbol.Name) is symbol:
+            del self.writable('symbDict')[symbol.Name]
+        self.version += 1
+        for listener in self.listeners:
+            listener.on_remove(symbol)
 
     def Terminal(self, name):
 
@@ -329,10 +489,33 @@ class Grammar:
             raise Exception("Empty name")
 
         term = Terminal(name, self)
-        self.terminals.append(term)
-        self.symbDict[name] = term
+        self.writable('terminals').append(term)
+        self.writable('symbDict')[name] = term
+        self.version += 1
+        for listener in self.listeners:
+            listener.on_add(term)
         return term
 
+    def writable(self, name):
+        """
+        Return the container `name` ready to be modified, copying it first if it is shared with a copy
+        """
+        if name in self.shared:
+            setattr(self, name, getattr(self, name).copy())
+            self.shared.discard(name)
+        return getattr(self, name)
+
+    def writable_entry(self, name, symbol):
+        """
+        Return the list of the index `name` for `symbol` ready to be modified
+        """
+        index = self.writable(name)
+        shared = self.sharedEntries[name]
+        if symbol in shared:
+            index[symbol] = index[symbol].copy()
+            shared.discard(symbol)
+        return index.setdefault(symbol, [])
+
     def Terminals(self, names):
 
         ans = tuple((self.Terminal(x) for x in names.strip().split()))
@@ -408,16 +591,131 @@ class Grammar:
 
         return G
 
+    def memo(self, key, builder):
+        """
+        Return `builder(self)` cached under `key` until the grammar changes
+        """
+        if self.cacheKey != (self.version, self.startSymbol):
+            self.cache = {}
+            self.cacheKey = (self.version, self.startSymbol)
+
+        try:
+            return self.cache[key]
+        except KeyError:
+            value = self.cache[key] = builder(self)
+            return value
+
+    def freeze(self):
+        """
+        Build an immutable snapshot of the grammar where every symbol and production has a dense integer id
+        :return: FrozenGrammar
+        """
+        return self.memo('frozen', FrozenGrammar)
+
+    def fingerprint(self):
+        """
+        Deterministic content hash over the terminals, non terminals, start symbol and ordered productions.
+        It is computed in linear time and cached until the grammar changes.
+        :return: hex digest
+        """
+        return self.memo('fingerprint', Grammar._fingerprint)
+
+    @staticmethod
+    def _fingerprint(G):
+        digest = hashlib.sha1()
+
+        def feed(tag, *symbols):
+            digest.update(tag.encode())
+            for symbol in symbols:
+                name = symbol.Name.encode()
+                digest.update(b'%d:%s' % (len(name), name))
+
+        feed('T', *G.terminals)
+        feed('N', *G.nonTerminals)
+        feed('S', *([G.startSymbol] if G.startSymbol is not None else []))
+        feed('K' + (G.pType.__name__ if G.pType is not None else ''))
+        for production in G.Productions:
+            feed('P', production.Left, *production.Right)
+
+        return digest.hexdigest()
+
+    def canonical(self):
+        """
+        Canonical form of the grammar, invariant under consistent renaming of the non terminals and under
+        reordering of the alternatives of a non terminal. It is cached until the grammar changes.
+
+        Non terminals are told apart by color refinement over the shape of their alternatives and then numbered
+        in breadth first order from the start symbol. Non terminals that refinement cannot tell apart are
+        structurally equivalent, so the order chosen among them does not change the canonical text except in
+        highly symmetric grammars.
+
+        :return: (fingerprint, renaming) where renaming maps every non terminal to its canonical index
+        """
+        return self.memo('canonical', Grammar._canonical)
+
+    @staticmethod
+    def _canonical(G):
+        def shape(body, label):
+            return tuple((0, symbol.Name) if symbol.IsTerminal else (1, label.get(symbol, -1)) for symbol in body)
+
+        # color refinement, the start symbol is the only one distinguished from the beginning
+        color = {X: int(X == G.startSymbol) for X in G.nonTerminals}
+        classes = len(set(color.values()))
+        while True:
+            signature = {X: (color[X], tuple(sorted(shape(body, color) for _, body in G.headIndex.get(X, []))))
+                         for X in G.nonTerminals}
+            ranks = {sign: i for i, sign in enumerate(sorted(set(signature.values())))}
+            color = {X: ranks[signature[X]] for X in G.nonTerminals}
+            if len(ranks) == classes:
+                break
+            classes = len(ranks)
+
+        # breadth first numbering, starting from the start symbol and then from the unreachable symbols
+        renaming = {}
+        roots = sorted(G.nonTerminals, key=lambda X: (X != G.startSymbol, color[X]))
+        for root in roots:
+            if root in renaming:
+                continue
+            renaming[root] = len(renaming)
+            queue = [root]
+            while queue:
+                X = queue.pop(0)
+                for _, body in sorted(G.headIndex.get(X, []), key=lambda p: shape(p.Right, color)):
+                    for symbol in body:
+                        if symbol.IsNonTerminal and symbol in color and symbol not in renaming:
+                            renaming[symbol] = len(renaming)
+                            queue.append(symbol)
+
+        digest = hashlib.sha1()
+        digest.update(repr(sorted(t.Name for t in G.terminals)).encode())
+        digest.update((G.pType.__name__ if G.pType is not None else '').encode())
+        for X in sorted(renaming, key=renaming.get):
+            bodies = sorted(shape(body, renaming) for _, body in G.headIndex.get(X, []))
+            digest.update(repr((renaming[X], bodies)).encode())
+
+        return digest.hexdigest(), renaming
+
     def copy(self):
+        """
+        Copy on write copy of the grammar, both grammars share their lists and indexes until one of them changes.
+        The symbols are shared too, the productions of X in the copy are `copy.headIndex[X]`, `X.productions`
+        are the ones of the grammar that created X
+        """
         G = Grammar()
-        G.Productions = self.Productions.copy()
-        G.nonTerminals = self.nonTerminals.copy()
-        G.terminals = self.terminals.copy()
         G.pType = self.pType
         G.startSymbol = self.startSymbol
         G.Epsilon = self.Epsilon
         G.EOF = self.EOF
-        G.symbDict = self.symbDict.copy()
+
+        for name in ('Productions', 'nonTerminals', 'terminals', 'symbDict', 'headIndex', 'leadingIndex',
+                     'occurrenceIndex'):
+            setattr(G, name, getattr(self, name))
+            self.shared.add(name)
+            G.shared.add(name)
+
+        for name in ('headIndex', 'leadingIndex', 'occurrenceIndex'):
+            self.sharedEntries[name].update(getattr(self, name))
+            G.sharedEntries[name].update(getattr(self, name))
 
         return G
 
@@ -433,30 +731,143 @@ class Grammar:
             return False
 
     def AugmentedGrammar(self, force=False):
+        """
+        The augmented grammar is memoized until this grammar changes, so it is shared by every caller
+        and must be treated as read only.
+        """
         if not self.IsAugmentedGrammar or force:
-
-            G = self.copy()
-            # S, self.startSymbol, SS = self.startSymbol, None, self.NonTerminal('S\'', True)
-            S = G.startSymbol
-            G.startSymbol = None
-            SS = G.NonTerminal('S\'', True)
-            if G.pType is AttributeProduction:
-                SS %= S + G.Epsilon, lambda x: x
-            else:
-                SS %= S + G.Epsilon
-
-            return G
+            return self.memo('augmented', Grammar._augment)
         else:
             return self.copy()
+
+    @staticmethod
+    def _augment(G):
+        G = G.copy()
+        # S, self.startSymbol, SS = self.startSymbol, None, self.NonTerminal('S\'', True)
+        S = G.startSymbol
+        G.startSymbol = None
+        SS = G.NonTerminal('S\'', True)
+        if G.pType is AttributeProduction:
+            SS %= S + G.Epsilon, identity_action
+        else:
+            SS %= S + G.Epsilon
+
+        return G
     # endchange
 
 
+class FrozenGrammar:
+    """
+    Immutable, integer interned snapshot of a Grammar.
+
+    Symbol ids are dense: EOF is always 0, the terminals take the ids [1, terminal_count)
+    and the non terminals the ids [terminal_count, len(symbols)).
+    The body of the production with id `p` is `bodies[offsets[p]:offsets[p + 1]]`.
+
+    The snapshot keeps the attributes read by the analysis and automaton code
+    (`Productions`, `terminals`, `nonTerminals`, `startSymbol`, `EOF`, `Epsilon`, `pType`)
+    so it can be used wherever a Grammar is only read.
+    """
+
+    def __init__(self, G):
+        self.grammar = G
+        self.Productions = tuple(G.Productions)
+        self.terminals = tuple(G.terminals)
+        self.nonTerminals = tuple(G.nonTerminals)
+        self.startSymbol = G.startSymbol
+        self.pType = G.pType
+        self.Epsilon = G.Epsilon
+        self.EOF = G.EOF
+
+        self.symbols = (G.EOF,) + self.terminals + self.nonTerminals
+        self.ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.terminal_count = len(self.terminals) + 1
+        self.is_terminal = array('b', [i < self.terminal_count for i in range(len(self.symbols))])
+        self.start = self.ids[G.startSymbol] if G.startSymbol is not None else -1
+
+        self.production_ids = {}
+        self.heads = array('i')
+        self.bodies = array('i')
+        self.offsets = array('i', [0])
+        by_head = [[] for _ in self.symbols]
+
+        for i, production in enumerate(self.Productions):
+            head = self.ids[production.Left]
+            self.production_ids.setdefault(production, i)
+            self.heads.append(head)
+            self.bodies.extend(self.ids[symbol] for symbol in production.Right)
+            self.offsets.append(len(self.bodies))
+            by_head[head].append(i)
+
+        self.by_head = tuple(tuple(productions) for productions in by_head)
+
+    def body(self, p):
+        return self.bodies[self.offsets[p]:self.offsets[p + 1]]
+
+    def freeze(self):
+        return self
+
+    def __len__(self):
+        return len(self.Productions)
+
+    def __getitem__(self, name):
+        return self.grammar[name]
+
+
+class Lookaheads(frozenset):
+    """
+    Lookahead set shared by the items, a frozenset that can be weakly referenced so the pool of
+    lookahead sets does not keep the terminals, and their grammar, alive
+    """
+
+    def __repr__(self):
+        return repr(frozenset(self))
+
+
 class Item:
+    """
+    LR item. Items are flyweights: equal (production, pos, lookaheads) triples always return the same
+    shared instance, and equal lookahead sets share the same frozenset.
+    Both pools only hold weak references and are keyed by the ids of the production and the terminals,
+    which the pooled value keeps alive, so an item or a lookahead set lives while something else uses it
+    and the pools never keep a grammar alive.
+    """
+    __slots__ = ('production', 'pos', 'lookaheads', '_hash', '__weakref__')
+
+    _pool = weakref.WeakValueDictionary()
+    _lookahead_pool = weakref.WeakValueDictionary()
+
+    def __new__(cls, production, pos, lookaheads=()):
+        if type(lookaheads) is not Lookaheads:
+            lookaheads = frozenset(lookaheads)
+            ids = frozenset(map(id, lookaheads))
+            try:
+                lookaheads = cls._lookahead_pool[ids]
+            except KeyError:
+                shared = cls._lookahead_pool[ids] = Lookaheads(lookaheads)
+                lookaheads = shared
+        key = (id(production), pos, id(lookaheads))
 
-    def __init__(self, production, pos, lookaheads=[]):
-        self.production = production
-        self.pos = pos
-        self.lookaheads = frozenset(look for look in lookaheads)
+        try:
+            return cls._pool[key]
+        except KeyError:
+            pass
+
+        item = super().__new__(cls)
+        item.production = production
+        item.pos = pos
+        item.lookaheads = lookaheads
+        item._hash = hash((production, pos, lookaheads))
+        cls._pool[key] = item
+        return item
+
+    def __reduce__(self):
+        return Item, (self.production, self.pos, frozenset(self.lookaheads))
+
+    @classmethod
+    def clear_pool(cls):
+        cls._pool.clear()
+        cls._lookahead_pool.clear()
 
     def __str__(self):
         s = str(self.production.Left) + " -> "
@@ -476,14 +887,14 @@ class Item:
         return str(self)
 
     def __eq__(self, other):
-        return (
+        return self is other or (
                 (self.pos == other.pos) and
                 (self.production == other.production) and
-                (set(self.lookaheads) == set(other.lookaheads))
+                (self.lookaheads == other.lookaheads)
         )
 
     def __hash__(self):
-        return hash((self.production, self.pos, self.lookaheads))
+        return self._hash
 
     @property
     def IsReduceItem(self):
@@ -7,6 +7,56 @@ from .ast import (ClosureNode, ConcatNode, EpsilonNode, PlusNode, QuestionNode,
 from .automata import DFA
 
 
+# Semantic actions of the regex grammar. They live at module level so the grammar
+# and the parser tables can be pickled.
+def first_child(s):
+    return s[1]
+
+
+def second_child(s):
+    return s[2]
+
+
+def union_node(s):
+    return UnionNode(s[1], s[3])
+
+
+def concat_node(s):
+    return ConcatNode(s[1], s[2])
+
+
+def closure_node(s):
+    return ClosureNode(s[1])
+
+
+def plus_node(s):
+    return PlusNode(s[1])
+
+
+def question_node(s):
+    return QuestionNode(s[1])
+
+
+def symbol_node(s):
+    return SymbolNode(s[1])
+
+
+def epsilon_node(s):
+    return EpsilonNode(s[1])
+
+
+def range_node(s):
+    return RangeNode(SymbolNode(s[1]), SymbolNode(s[3]))
+
+
+def symbol_union_node(s):
+    return UnionNode(SymbolNode(s[1]), s[2])
+
+
+def range_union_node(s):
+    return UnionNode(RangeNode(SymbolNode(s[1]), SymbolNode(s[3])), s[4])
+
+
 class Regex:
     def __init__(self, regex, skip_whitespaces=False):
         self.regex = regex
@@ -34,26 +84,26 @@ class Regex:
         pipe, star, opar, cpar, symbol, epsilon, osquare, csquare, minus, plus, question = G.Terminals(
             '| * ( ) symbol ε [ ] - + ?')
 
-        E %= E + pipe + T, lambda s: UnionNode(s[1], s[3])
-        E %= T, lambda s: s[1]
+        E %= E + pipe + T, union_node
+        E %= T, first_child
 
-        T %= T + F, lambda s: ConcatNode(s[1], s[2])
-        T %= F, lambda s: s[1]
+        T %= T + F, concat_node
+        T %= F, first_child
 
-        F %= A + star, lambda s: ClosureNode(s[1])
-        F %= A + plus, lambda s: PlusNode(s[1])
-        F %= A + question, lambda s: QuestionNode(s[1])
-        F %= A, lambda s: s[1]
+        F %= A + star, closure_node
+        F %= A + plus, plus_node
+        F %= A + question, question_node
+        F %= A, first_child
 
-        A %= symbol, lambda s: SymbolNode(s[1])
-        A %= epsilon, lambda s: EpsilonNode(s[1])
-        A %= opar + E + cpar, lambda s: s[2]
-        A %= osquare + L + csquare, lambda s: s[2]
+        A %= symbol, symbol_node
+        A %= epsilon, epsilon_node
+        A %= opar + E + cpar, second_child
+        A %= osquare + L + csquare, second_child
 
-        L %= symbol, lambda s: SymbolNode(s[1])
-        L %= symbol + minus + symbol, lambda s: RangeNode(SymbolNode(s[1]), SymbolNode(s[3]))
-        L %= symbol + L, lambda s: UnionNode(SymbolNode(s[1]), s[2])
-        L %= symbol + minus + symbol + L, lambda s: UnionNode(RangeNode(SymbolNode(s[1]), SymbolNode(s[3])), s[4])
+        L %= symbol, symbol_node
+        L %= symbol + minus + symbol, range_node
+        L %= symbol + L, symbol_union_node
+        L %= symbol + minus + symbol + L, range_union_node
 
         return G
 
@@ -86,48 +136,48 @@ class RegexParser(ShiftReduceParser):
             (2, G["symbol"]): ("SHIFT", 3),
             (2, G["ε"]): ("SHIFT", 4),
             (2, G["("]): ("SHIFT", 2),
-            (3, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (3, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (3, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (3, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (3, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (3, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
+            (3, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (3, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (3, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (3, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (3, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (3, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
             (3, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (3, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (3, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (4, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G["symbol"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (4, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
+                "REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (3, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (3, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (4, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G["symbol"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (4, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
             (5, G["symbol"]): ("SHIFT", 6),
-            (6, G["]"]): ("REDUCE", AttributeProduction(G["L"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
+            (6, G["]"]): ("REDUCE", AttributeProduction(G["L"], Sentence(G["symbol"]), [symbol_node])),
             (6, G["-"]): ("SHIFT", 7),
             (6, G["symbol"]): ("SHIFT", 6),
             (7, G["symbol"]): ("SHIFT", 8),
             (8, G["]"]): ("REDUCE", AttributeProduction(G["L"], Sentence(G["symbol"], G["-"], G["symbol"]),
-                                                        [lambda s: RangeNode(SymbolNode(s[1]), SymbolNode(s[3]))])),
+                                                        [range_node])),
             (8, G["symbol"]): ("SHIFT", 6),
             (9, G["]"]): ("REDUCE", AttributeProduction(G["L"], Sentence(G["symbol"], G["-"], G["symbol"], G["L"]), [
-                lambda s: UnionNode(RangeNode(SymbolNode(s[1]), SymbolNode(s[3])), s[4])])),
+                range_union_node])),
             (10, G["]"]): ("REDUCE", AttributeProduction(G["L"], Sentence(G["symbol"], G["L"]),
-                                                         [lambda s: UnionNode(SymbolNode(s[1]), s[2])])),
+                                                         [symbol_union_node])),
             (11, G["]"]): ("SHIFT", 12),
-            (12, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (12, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (12, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (12, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (12, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (12, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
+            (12, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (12, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (12, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (12, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (12, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (12, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
             (12, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (12, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (12, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
+                "REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (12, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (12, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
             (13, G["|"]): ("SHIFT", 14),
             (13, G[")"]): ("SHIFT", 22),
             (14, G["["]): ("SHIFT", 5),
@@ -139,128 +189,128 @@ class RegexParser(ShiftReduceParser):
             (15, G["ε"]): ("SHIFT", 4),
             (15, G["|"]): (
                 "REDUCE",
-                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [lambda s: UnionNode(s[1], s[3])])),
+                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [union_node])),
             (15, G[")"]): (
                 "REDUCE",
-                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [lambda s: UnionNode(s[1], s[3])])),
+                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [union_node])),
             (15, G["("]): ("SHIFT", 2),
             (16, G["|"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (16, G["("]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (16, G[")"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (16, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (16, G["ε"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (16, G["["]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (17, G["*"]): ("SHIFT", 18),
-            (17, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (17, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (17, G[")"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (17, G["symbol"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (17, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (17, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
+            (17, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (17, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (17, G[")"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (17, G["symbol"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (17, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (17, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
             (17, G["+"]): ("SHIFT", 19),
             (17, G["?"]): ("SHIFT", 20),
             (18, G["|"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (18, G["("]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (18, G[")"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (18, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (18, G["ε"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (18, G["["]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
-            (19, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (19, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (19, G[")"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
+            (19, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (19, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (19, G[")"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
             (19, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (19, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (19, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (19, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (19, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
             (20, G["|"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (20, G["("]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (20, G[")"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (20, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (20, G["ε"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (20, G["["]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
-            (21, G["|"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (21, G["("]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (21, G[")"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (21, G["symbol"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (21, G["ε"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (21, G["["]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (22, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (22, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (22, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (22, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (22, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (22, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
+            (21, G["|"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (21, G["("]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (21, G[")"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (21, G["symbol"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (21, G["ε"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (21, G["["]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (22, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (22, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (22, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (22, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (22, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (22, G[")"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
             (22, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (22, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (22, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
+                "REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (22, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (22, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
             (23, G["["]): ("SHIFT", 5),
             (23, G["symbol"]): ("SHIFT", 3),
-            (23, G["|"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [lambda s: s[1]])),
-            (23, G[")"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [lambda s: s[1]])),
+            (23, G["|"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [first_child])),
+            (23, G[")"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [first_child])),
             (23, G["ε"]): ("SHIFT", 4),
             (23, G["("]): ("SHIFT", 2),
             (24, G["|"]): ("SHIFT", 14),
             (24, G[")"]): ("SHIFT", 25),
-            (25, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (25, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (25, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (25, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (25, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
+            (25, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (25, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (25, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (25, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (25, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
             (25, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (25, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (25, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (25, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [lambda s: s[2]])),
-            (26, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (26, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (26, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (26, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (26, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
+                "REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (25, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (25, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (25, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["("], G["E"], G[")"]), [second_child])),
+            (26, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (26, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (26, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (26, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (26, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
             (26, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (26, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (26, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (26, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [lambda s: SymbolNode(s[1])])),
-            (27, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["symbol"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
-            (27, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [lambda s: EpsilonNode(s[1])])),
+                "REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (26, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (26, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (26, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["symbol"]), [symbol_node])),
+            (27, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["symbol"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
+            (27, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["ε"]), [epsilon_node])),
             (28, G["symbol"]): ("SHIFT", 6),
             (29, G["]"]): ("SHIFT", 30),
-            (30, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (30, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (30, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (30, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (30, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
+            (30, G["|"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (30, G["+"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (30, G["?"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (30, G["*"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (30, G["("]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
             (30, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (30, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (30, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
-            (30, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [lambda s: s[2]])),
+                "REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (30, G["ε"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (30, G["$"]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
+            (30, G["["]): ("REDUCE", AttributeProduction(G["A"], Sentence(G["["], G["L"], G["]"]), [second_child])),
             (31, G["|"]): ("SHIFT", 32),
             (31, G["$"]): ("OK", None),
             (32, G["ε"]): ("SHIFT", 27),
@@ -272,73 +322,73 @@ class RegexParser(ShiftReduceParser):
             (33, G["["]): ("SHIFT", 28),
             (33, G["|"]): (
                 "REDUCE",
-                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [lambda s: UnionNode(s[1], s[3])])),
+                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [union_node])),
             (33, G["$"]): (
                 "REDUCE",
-                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [lambda s: UnionNode(s[1], s[3])])),
+                AttributeProduction(G["E"], Sentence(G["E"], G["|"], G["T"]), [union_node])),
             (33, G["symbol"]): ("SHIFT", 26),
             (34, G["|"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (34, G["("]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (34, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (34, G["ε"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (34, G["$"]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (34, G["["]): (
-                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [lambda s: ConcatNode(s[1], s[2])])),
+                "REDUCE", AttributeProduction(G["T"], Sentence(G["T"], G["F"]), [concat_node])),
             (35, G["*"]): ("SHIFT", 36),
-            (35, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (35, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (35, G["symbol"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (35, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (35, G["$"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
-            (35, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [lambda s: s[1]])),
+            (35, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (35, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (35, G["symbol"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (35, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (35, G["$"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
+            (35, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"]), [first_child])),
             (35, G["+"]): ("SHIFT", 37),
             (35, G["?"]): ("SHIFT", 38),
             (36, G["|"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (36, G["("]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (36, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (36, G["ε"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (36, G["$"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
             (36, G["["]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [lambda s: ClosureNode(s[1])])),
-            (37, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (37, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["*"]), [closure_node])),
+            (37, G["|"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (37, G["("]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
             (37, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (37, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (37, G["$"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
-            (37, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [lambda s: PlusNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (37, G["ε"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (37, G["$"]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
+            (37, G["["]): ("REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["+"]), [plus_node])),
             (38, G["|"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (38, G["("]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (38, G["symbol"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (38, G["$"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (38, G["ε"]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
             (38, G["["]): (
-                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [lambda s: QuestionNode(s[1])])),
-            (39, G["|"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (39, G["("]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (39, G["symbol"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (39, G["$"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (39, G["ε"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
-            (39, G["["]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [lambda s: s[1]])),
+                "REDUCE", AttributeProduction(G["F"], Sentence(G["A"], G["?"]), [question_node])),
+            (39, G["|"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (39, G["("]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (39, G["symbol"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (39, G["$"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (39, G["ε"]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
+            (39, G["["]): ("REDUCE", AttributeProduction(G["T"], Sentence(G["F"]), [first_child])),
             (40, G["ε"]): ("SHIFT", 27),
             (40, G["("]): ("SHIFT", 1),
-            (40, G["|"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [lambda s: s[1]])),
-            (40, G["$"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [lambda s: s[1]])),
+            (40, G["|"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [first_child])),
+            (40, G["$"]): ("REDUCE", AttributeProduction(G["E"], Sentence(G["T"]), [first_child])),
             (40, G["["]): ("SHIFT", 28),
             (40, G["symbol"]): ("SHIFT", 26),
         }
@@ -39,6 +39,9 @@ class ContainerSet:
     def hard_update(self, other):
         return self.update(other) | self.epsilon_update(other)
 
+    def copy(self):
+        return ContainerSet(*self.set, contains_epsilon=self.contains_epsilon)
+
     def find_match(self, match):
         for item in self.set:
             if item == match:
@@ -63,10 +66,136 @@ class ContainerSet:
     def __eq__(self, other):
         if isinstance(other, set):
             return self.set == other
+        if isinstance(other, BitContainerSet):
+            return other == self
         return isinstance(other,
                           ContainerSet) and self.set == other.set and self.contains_epsilon == other.contains_epsilon
 
 
+def bits(mask):
+    """
+    Positions of the bits set in `mask`, from the lowest
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitContainerSet:
+    """
+    ContainerSet over a fixed universe of symbols stored as an int bitmask.
+
+    `universe` gives every symbol a dense id through `universe.ids` and back through
+    `universe.symbols` (a FrozenGrammar works, terminals and EOF take the lowest ids).
+    Unions of sets over the same universe are a single OR of their masks.
+    It is built like a ContainerSet, without a `universe` the set takes the frozen grammar of the first
+    symbol added or the universe of the first BitContainerSet merged into it.
+    """
+    __slots__ = ('universe', 'mask', 'contains_epsilon')
+
+    def __init__(self, *values, contains_epsilon=False, universe=None):
+        self.universe = universe
+        self.mask = 0
+        self.contains_epsilon = contains_epsilon
+        self.extend(values)
+
+    @classmethod
+    def from_mask(cls, universe, mask, contains_epsilon=False):
+        container = cls.__new__(cls)
+        container.universe = universe
+        container.mask = mask
+        container.contains_epsilon = contains_epsilon
+        return container
+
+    def ids_of(self, value):
+        if self.universe is None:
+            self.universe = value.Grammar.freeze()
+        return self.universe.ids
+
+    def mask_of(self, other):
+        if isinstance(other, BitContainerSet):
+            if self.universe is None:
+                self.universe = other.universe
+            if other.universe is self.universe:
+                return other.mask
+        mask = 0
+        for value in other:
+            mask |= 1 << self.ids_of(value)[value]
+        return mask
+
+    @property
+    def set(self):
+        return set(self)
+
+    def add(self, value):
+        last = self.mask
+        self.mask |= 1 << self.ids_of(value)[value]
+        return last != self.mask
+
+    def extend(self, values):
+        last = self.mask
+        for value in values:
+            self.mask |= 1 << self.ids_of(value)[value]
+        return last != self.mask
+
+    def set_epsilon(self, value=True):
+        last = self.contains_epsilon
+        self.contains_epsilon = value
+        return last != self.contains_epsilon
+
+    def update(self, other):
+        last = self.mask
+        self.mask |= self.mask_of(other)
+        return last != self.mask
+
+    def epsilon_update(self, other):
+        return self.set_epsilon(self.contains_epsilon | other.contains_epsilon)
+
+    def hard_update(self, other):
+        return self.update(other) | self.epsilon_update(other)
+
+    def copy(self):
+        return BitContainerSet.from_mask(self.universe, self.mask, self.contains_epsilon)
+
+    def find_match(self, match):
+        for item in self:
+            if item == match:
+                return item
+        return None
+
+    def __contains__(self, value):
+        if self.universe is None:
+            return False
+        try:
+            return bool(self.mask >> self.universe.ids[value] & 1)
+        except KeyError:
+            return False
+
+    def __len__(self):
+        return bin(self.mask).count('1') + int(self.contains_epsilon)
+
+    def __str__(self):
+        return '%s-%s' % (str(self.set), self.contains_epsilon)
+
+    def __repr__(self):
+        return str(self)
+
+    def __iter__(self):
+        if self.universe is None:
+            return iter(())
+        symbols = self.universe.symbols
+        return (symbols[i] for i in bits(self.mask))
+
+    def __eq__(self, other):
+        if isinstance(other, set):
+            return self.set == other
+        if isinstance(other, BitContainerSet) and other.universe is self.universe:
+            return self.mask == other.mask and self.contains_epsilon == other.contains_epsilon
+        return isinstance(other, (ContainerSet, BitContainerSet)) and \
+            self.set == other.set and self.contains_epsilon == other.contains_epsilon
+
+
 def inspect(item, grammar_name='G', mapper=None):
     try:
         return mapper[item]
@@ -76,7 +205,7 @@ def inspect(item, grammar_name='G', mapper=None):
                 f'{inspect(key, grammar_name, mapper)}: {inspect(value, grammar_name, mapper)}' for key, value in
                 item.items())
             return f'{{\n   {items} \n}}'
-        elif isinstance(item, ContainerSet):
+        elif isinstance(item, (ContainerSet, BitContainerSet)):
             args = f'{", ".join(inspect(x, grammar_name, mapper) for x in item.set)} ,' if item.set else ''
             return f'ContainerSet({args} contains_epsilon={item.contains_epsilon})'
         elif isinstance(item, EOF):
@@ -1,3 +1,4 @@
+import io
 import json
 
 import streamlit as st
@@ -7,8 +8,10 @@ from cmp.pycompiler import Grammar
 from cmp.utils import Token, tokenizer
 from examples import (AritmethicStartSymbol, AritmethicNonTerminalsLR, AritmethicTerminals, AritmethicProductionsLR,
                       AritmethicAliases)
-from cmp.grammalyzer import (LLDerivationTree, LRDerivationTree, LALR1Parser, LL1Parser, LR1Parser, SLR1Parser, Lexer,
-                             delete_common_prefix, delete_immediate_left_recursion, clean_grammar)
+from cmp.grammalyzer import (LLDerivationTree, LRDerivationTree, LALR1Parser, LL1Parser, LLkParser, LR1Parser,
+                             MinimalLR1Parser, SLR1Parser, Lexer, AutomatonBudgetExceeded,
+                             delete_common_prefix, delete_immediate_left_recursion, clean_grammar, load_bnf,
+                             load_jsonl)
 from cmp.grammalyzer.conflict import LLConflictStringGenerator, LRConflictStringGenerator
 from cmp.regex.utils import RegularGrammar
 
@@ -156,10 +159,10 @@ def modify_grammar(G):
 
 
 def deal_with_conflict(parser, parser_type):
-    if parser_type == 'LL(1)':
+    if parser_type in ('LL(1)', 'LL(k)'):
         conflictgen = LLConflictStringGenerator(parser)
         x, s = conflictgen.conflict
-        st.error(f'Parser LL(1) con conflicto en la entrada : ({x}, {s})')
+        st.error(f'Parser {parser_type} con conflicto en la entrada : ({x}, {s})')
         body = f"""# Cadenas de conflicto :
 ## Con la produccion : {repr(conflictgen.prod1)}
         {conflictgen.s1}
@@ -178,12 +181,28 @@ def deal_with_conflict(parser, parser_type):
         st.markdown(body)
 
 
+def deal_with_budget(error, parser_type):
+    st.error(f'La construccion del automata {parser_type} excedio el limite {error.limit} = {error.value}')
+    summary = f'{error.states} estados y {error.items} items en los kernels ' \
+              f'en {error.elapsed:.2f}s ({error.growth_rate:.0f} estados/s)'
+    body = f"""# Construccion interrumpida :
+    {summary}
+## Kernels mas pesados :
+"""
+    for state, kernel in error.heaviest:
+        body += f"""### Estado {state} ({len(kernel)} items)
+        {'  |  '.join(str(item) for item in kernel)}
+"""
+    st.markdown(body)
+
+
 def manual_input_app():
     ################
     # Declarations #
     ################
     G = Grammar()
-    parsers = {'LL(1)': LL1Parser, 'SLR(1)': SLR1Parser, 'LR(1)': LR1Parser, 'LALR(1)': LALR1Parser}
+    parsers = {'LL(1)': LL1Parser, 'LL(k)': LLkParser, 'SLR(1)': SLR1Parser, 'LR(1)': LR1Parser,
+               'LR(1) Pager': MinimalLR1Parser, 'LALR(1)': LALR1Parser}
 
     #################
     # Input Options #
@@ -194,8 +213,14 @@ def manual_input_app():
     ###################
     # Parser Selector #
     ###################
-    parser_type = st.sidebar.selectbox('Seleccione el algoritmo de Parsing', ('LL(1)', 'SLR(1)', 'LR(1)', 'LALR(1)'),
-                                       index=1)
+    parser_type = st.sidebar.selectbox('Seleccione el algoritmo de Parsing',
+                                       ('LL(1)', 'LL(k)', 'SLR(1)', 'LR(1)', 'LR(1) Pager', 'LALR(1)'),
+                                       index=2)
+    if parser_type == 'LL(k)':
+        k = st.sidebar.number_input('k :', min_value=1, value=2)
+    elif parser_type != 'LL(1)':
+        max_states = st.sidebar.number_input('Maximo de estados :', min_value=1, value=5000)
+        deadline = st.sidebar.number_input('Tiempo limite (s) :', min_value=1, value=30)
 
     ################################################
     # Start Symbol, Non terminal & terminals Input #
@@ -242,7 +267,16 @@ def manual_input_app():
     # Preparacion del parser #
     ##########################
     ParserClass = parsers[parser_type]
-    parser = ParserClass(G)
+    if parser_type == 'LL(k)':
+        parser = ParserClass(G, int(k))
+    elif parser_type == 'LL(1)':
+        parser = ParserClass(G)
+    else:
+        try:
+            parser = ParserClass(G, max_states=int(max_states), deadline=deadline)
+        except AutomatonBudgetExceeded as e:
+            deal_with_budget(e, parser_type)
+            return
 
     ##########
     # Salvar #
@@ -289,7 +323,7 @@ def manual_input_app():
     #  Parsing Table #
     ##################
     if st.checkbox('Mostrar Tabla de Parsing'):
-        if parser_type == 'LL(1)':
+        if parser_type in ('LL(1)', 'LL(k)'):
             st.subheader("Table :")
             st.dataframe(lltable_to_dataframe(parser.table))
         else:
@@ -301,7 +335,7 @@ def manual_input_app():
     ###############
     # Automata LR #
     ###############
-    if parser_type != 'LL(1)':
+    if parser_type not in ('LL(1)', 'LL(k)'):
         if st.checkbox('Mostrar Automata LR'):
             st.graphviz_chart(str(parser.automaton.graph()))
         dtree = LRDerivationTree
@@ -332,16 +366,29 @@ def manual_input_app():
 
 
 def load_from_file_app():
-    file = st.file_uploader('Cargar gramatica desde archivo')
-    st.write(type(file))
+    file = st.file_uploader('Cargar gramatica desde archivo', type=['bnf', 'txt', 'jsonl'])
+    if file is None:
+        return
+
+    lines = io.TextIOWrapper(file, encoding='utf8')
+    G, report = load_jsonl(lines) if file.name.endswith('.jsonl') else load_bnf(lines)
+    st.sidebar.success(f'Cargada en {report.seconds:.3f}s ({report.rate:.0f} producciones/s)')
+    for error in report.errors:
+        st.sidebar.warning(error)
+    show_grammar(G)
 
 
 def main():
-    app_option = st.sidebar.selectbox('Choose an option', ('-', 'Manual Input'), index=0)
+    app_option = st.sidebar.selectbox('Choose an option', ('-', 'Manual Input', 'Load from file'), index=0)
 
     if app_option == '-':
         st.sidebar.success('Choose an option above')
         st.markdown(body=PRESENTATION)
+    elif app_option == 'Load from file':
+        try:
+            load_from_file_app()
+        except Exception as e:
+            st.error(e.args[0])
     else:
         try:
             manual_input_app()
@@ -0,0 +1,35 @@
+import unittest
+
+from cmp.grammalyzer.utils import compute_firsts, compute_local_first
+from cmp.pycompiler import Grammar
+from cmp.utils import BitContainerSet, ContainerSet
+
+from .test_closure_templates import random_grammar
+
+
+class BitContainerSetTest(unittest.TestCase):
+    def test_built_like_container_set(self):
+        G = Grammar()
+        a, b = G.Terminals('a b')
+        empty = BitContainerSet()
+        self.assertEqual(empty, ContainerSet())
+        self.assertNotIn(a, empty)
+
+        empty.add(a)
+        self.assertEqual(empty, ContainerSet(a))
+        self.assertEqual(BitContainerSet(a, b, contains_epsilon=True), ContainerSet(a, b, contains_epsilon=True))
+
+    def test_one_container_type(self):
+        for seed in range(100):
+            with self.subTest(seed=seed):
+                G = random_grammar(seed)
+                firsts = compute_firsts(G, BitContainerSet)
+                universe = firsts[G.startSymbol].universe
+                for first in list(firsts.values()) + [compute_local_first(firsts, G.Epsilon)]:
+                    self.assertIsInstance(first, BitContainerSet)
+                    self.assertIs(first.universe, universe)
+                self.assertEqual(firsts, compute_firsts(G))
+
+
+if __name__ == '__main__':
+    unittest.main()
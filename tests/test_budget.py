@@ -0,0 +1,49 @@
+import pickle
+import unittest
+
+from cmp.grammalyzer import AutomatonBudgetExceeded
+from cmp.grammalyzer.parsing import LALR1Parser, LR1Parser, MinimalLR1Parser, SLR1Parser
+from cmp.pycompiler import Grammar
+
+
+def arithmetic():
+    G = Grammar()
+    E = G.NonTerminal('E', True)
+    T, F = G.NonTerminals('T F')
+    plus, star, opar, cpar, num = G.Terminals('+ * ( ) num')
+    E %= E + plus + T | T
+    T %= T + star + F | F
+    F %= opar + E + cpar | num
+    return G
+
+
+class AutomatonBudgetTest(unittest.TestCase):
+    parsers = [(SLR1Parser, {}), (LR1Parser, {}), (LR1Parser, {'workers': 2}), (LALR1Parser, {}),
+               (MinimalLR1Parser, {})]
+
+    def test_limits(self):
+        G = arithmetic()
+        for limit, value in (('max_states', 5), ('max_items', 5), ('deadline', 0)):
+            for parser_type, options in self.parsers:
+                with self.subTest(limit=limit, parser=parser_type.__name__, **options):
+                    with self.assertRaises(AutomatonBudgetExceeded) as context:
+                        parser_type(G, **options, **{limit: value})
+                    error = context.exception
+                    self.assertEqual((error.limit, error.value), (limit, value))
+                    if limit == 'max_states':
+                        self.assertGreater(error.states, value)
+                    if limit == 'max_items':
+                        self.assertGreater(error.items, value)
+                    self.assertTrue(0 < len(error.heaviest) <= 5)
+                    self.assertEqual(str(pickle.loads(pickle.dumps(error))), str(error))
+
+    def test_within_the_limits(self):
+        G = arithmetic()
+        for parser_type, options in self.parsers:
+            with self.subTest(parser=parser_type.__name__, **options):
+                parser = parser_type(G, **options, max_states=1000, max_items=10000, deadline=60)
+                self.assertIsNone(parser.conflict)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from cmp.grammalyzer.cleaner import delete_common_prefix, delete_unary_productions
+from cmp.pycompiler import Grammar
+
+
+class CleanerTest(unittest.TestCase):
+    def test_common_prefix_order(self):
+        G = Grammar()
+        E = G.NonTerminal('E', True)
+        a, b, c, d = G.Terminals('a b c d')
+        E %= a + b
+        E %= b + c
+        E %= b + d
+        E %= a + c
+        delete_common_prefix(G)
+        self.assertEqual([X.Name for X in G.nonTerminals], ['E', "E'", "E''"])
+        self.assertEqual([str(p) for p in G.Productions],
+                         ["E := a E'", "E' := b", "E' := c", "E := b E''", "E'' := d", "E'' := c"])
+
+    def test_unary_bodies_once(self):
+        G = Grammar()
+        A = G.NonTerminal('A', True)
+        B = G.NonTerminal('B')
+        c, d = G.Terminals('c d')
+        A %= B + G.Epsilon
+        A %= c + G.Epsilon
+        B %= c + G.Epsilon
+        B %= A + G.Epsilon
+        B %= d + G.Epsilon
+        delete_unary_productions(G)
+        self.assertEqual(sorted(str(p) for p in G.headIndex[A]), ['A := c', 'A := d'])
+        self.assertEqual(sorted(str(p) for p in G.headIndex[B]), ['B := c', 'B := d'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from cmp.grammalyzer.automatas import closure_lr1, closure_templates, goto_lr1
+from cmp.grammalyzer.utils import firsts_and_follows
+from cmp.pycompiler import Grammar, Item, Sentence
+from cmp.utils import ContainerSet
+
+
+def random_grammar(seed):
+    """
+    Small random grammar, usually with non productive and nullable non terminals
+    """
+    rnd = random.Random(seed)
+    G = Grammar()
+    nonterminals = [G.NonTerminal('S', True)] + list(G.NonTerminals('A B C D'))
+    terminals = list(G.Terminals('a b c'))
+    for _ in range(rnd.randint(2, 10)):
+        X = rnd.choice(nonterminals)
+        size = rnd.randint(0, 4)
+        X %= G.Epsilon if not size else Sentence(*[rnd.choice(nonterminals + terminals) for _ in range(size)])
+    return G
+
+
+class ClosureTemplatesTest(unittest.TestCase):
+    def assert_same_closures(self, G, max_kernels=300):
+        """
+        The closure of every kernel of the canonical LR(1) automaton is the same with the templates
+        and with closure_lr1
+        """
+        G = G.AugmentedGrammar(True)
+        firsts = dict(firsts_and_follows(G)[0])
+        firsts[G.EOF] = ContainerSet(G.EOF)
+        templates = closure_templates(G)
+
+        start = frozenset([Item(G.startSymbol.productions[0], 0, (G.EOF,))])
+        seen = {start}
+        pending = [start]
+        while pending and len(seen) < max_kernels:
+            kernel = pending.pop()
+            closure = closure_lr1(kernel, firsts)
+            self.assertEqual(templates.closure_lr1(kernel), closure, kernel)
+            for symbol in {item.NextSymbol for item in closure if item.NextSymbol is not None}:
+                goto = goto_lr1(closure, symbol, firsts, just_kernel=True)
+                if goto not in seen:
+                    seen.add(goto)
+                    pending.append(goto)
+
+    def test_non_productive(self):
+        G = Grammar()
+        S = G.NonTerminal('S', True)
+        A = G.NonTerminal('A')
+        b = G.Terminal('b')
+        S %= A + S
+        A %= S + b
+        self.assert_same_closures(G)
+
+    def test_random_grammars(self):
+        for seed in range(500):
+            with self.subTest(seed=seed):
+                self.assert_same_closures(random_grammar(seed))
+
+
+if __name__ == '__main__':
+    unittest.main()
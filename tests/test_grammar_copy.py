@@ -0,0 +1,61 @@
+import unittest
+
+from cmp.grammalyzer.automatas import build_larl1_automaton, build_lr1_automaton, closure_lr0, closure_lr1
+from cmp.grammalyzer.utils import firsts_and_follows
+from cmp.pycompiler import Grammar, Item, Production, Sentence
+from cmp.utils import BitContainerSet, ContainerSet
+
+
+def arithmetic():
+    G = Grammar()
+    E = G.NonTerminal('E', True)
+    T = G.NonTerminal('T')
+    plus, num = G.Terminals('+ num')
+    E %= E + plus + T
+    E %= T
+    T %= num
+    return G
+
+
+class GrammarCopyTest(unittest.TestCase):
+    def test_copy_edits_keep_the_original(self):
+        G = arithmetic()
+        E, T, plus = G['E'], G['T'], G['+']
+        H = G.copy()
+
+        H.Add_Production(Production(T, Sentence(plus)))
+        H.Remove_Production(H.headIndex[E][0])
+
+        self.assertEqual([str(p) for p in T.productions], ['T := num'])
+        self.assertEqual([str(p) for p in E.productions], ['E := E + T', 'E := T'])
+        self.assertEqual(sorted(map(str, G.Productions)), sorted(str(p) for X in G.nonTerminals for p in X.productions))
+        self.assertEqual([str(p) for p in H.headIndex[T]], ['T := num', 'T := +'])
+        self.assertEqual([str(p) for p in H.headIndex[E]], ['E := T'])
+
+    def test_builders_keep_the_memoized_firsts(self):
+        G = arithmetic().AugmentedGrammar(True)
+        for container in (ContainerSet, BitContainerSet):
+            firsts = firsts_and_follows(G, container)[0]
+            build_lr1_automaton(G, firsts=firsts)
+            self.assertNotIn(G.EOF, firsts)
+
+    def test_closures_read_the_given_grammar(self):
+        G = arithmetic()
+        E, T, plus = G['E'], G['T'], G['+']
+        H = G.copy()
+        H.Add_Production(Production(T, Sentence(plus)))
+        start = [Item(H.headIndex[E][1], 0, (G.EOF,))]
+
+        firsts = dict(firsts_and_follows(H)[0])
+        firsts[G.EOF] = ContainerSet(G.EOF)
+        self.assertIn('T := +', {str(item.production) for item in closure_lr0(start, H)})
+        self.assertIn('T := +', {str(item.production) for item in closure_lr1(start, firsts, G=H)})
+        self.assertNotIn('T := +', {str(item.production) for item in closure_lr0(start)})
+
+        augmented = H.AugmentedGrammar(True)
+        states = build_larl1_automaton(augmented, dict(firsts_and_follows(augmented)[0]))
+        self.assertIn('T := +', {str(item.production) for state in states for item in state.state})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from cmp.grammalyzer.automatas import build_larl1_automaton, build_lalr1_automaton
+from cmp.grammalyzer.utils import firsts_and_follows
+from cmp.pycompiler import Grammar
+
+from .test_closure_templates import random_grammar
+
+
+class LALR1AutomatonTest(unittest.TestCase):
+    def assert_same_automaton(self, G):
+        """
+        The DeRemer-Pennello automaton has the states, with their lookaheads, of the one that merges the LR(1) states
+        """
+        G = G.AugmentedGrammar(True)
+        firsts = dict(firsts_and_follows(G)[0])
+        merged = [state.state for state in build_larl1_automaton(G, firsts)]
+        self.assertEqual([state.state for state in build_lalr1_automaton(G)], merged)
+
+    def test_non_productive(self):
+        G = Grammar()
+        S = G.NonTerminal('S', True)
+        A, B = G.NonTerminals('A B')
+        a, b = G.Terminals('a b')
+        S %= A + B + a
+        S %= b
+        A %= B + S
+        B %= A + b
+        self.assert_same_automaton(G)
+
+    def test_random_grammars(self):
+        for seed in range(500):
+            with self.subTest(seed=seed):
+                self.assert_same_automaton(random_grammar(seed))
+
+
+if __name__ == '__main__':
+    unittest.main()
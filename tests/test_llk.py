@@ -0,0 +1,40 @@
+import unittest
+
+from cmp.grammalyzer.parsing import LL1Parser, LLkParser
+from cmp.pycompiler import Grammar
+from cmp.utils import Token
+
+from .test_closure_templates import random_grammar
+
+
+class LLkParserTest(unittest.TestCase):
+    def test_k1_is_ll1(self):
+        """
+        Without empty bodies the LL(1) table is the LL(k) table for k = 1
+        """
+        for seed in range(300):
+            with self.subTest(seed=seed):
+                G = random_grammar(seed)
+                for production in [p for p in G.Productions if p.IsEpsilon]:
+                    G.Remove_Production(production)
+                ll1, llk = LL1Parser(G), LLkParser(G, 1)
+                table = {(head, lookahead[0]): productions for (head, lookahead), productions in llk.table.items()}
+                self.assertEqual(table, ll1.table)
+                self.assertEqual(llk.conflict is None, ll1.conflict is None)
+
+    def test_ll2_grammar(self):
+        G = Grammar()
+        S = G.NonTerminal('S', True)
+        a, b, c = G.Terminals('a b c')
+        S %= a + b
+        S %= a + c
+
+        self.assertIsNotNone(LL1Parser(G).conflict)
+        parser = LLkParser(G, 2)
+        self.assertIsNone(parser.conflict)
+        tokens = [Token('a', a), Token('c', c), Token('$', G.EOF)]
+        self.assertEqual([str(p) for p in parser(tokens)], ['S := a c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from cmp.grammalyzer.loader import load_bnf, load_jsonl
+
+
+class LoaderTest(unittest.TestCase):
+    def test_start_after_the_productions(self):
+        G, report = load_bnf(['%terminals a', 'E -> a', '%start E'])
+        self.assertEqual(G.startSymbol.Name, 'E')
+        self.assertEqual(report.errors, [])
+
+        with self.assertRaisesRegex(ValueError, r'Line 3: .*declare %start before the productions'):
+            load_bnf(['E -> T', 'T -> a', '%start T'])
+
+    def test_terminals_after_their_use(self):
+        G, report = load_bnf(['E -> T + E | T', 'T -> num', '%terminals + num'])
+        self.assertEqual(G.terminals, [])
+        self.assertEqual(len(report.errors), 2)
+        self.assertTrue(all(error.startswith('Line 3: ') for error in report.errors))
+
+        G, report = load_jsonl(['{"Head": "E", "Body": ["a"]}', '{"Terminals": ["a"]}'])
+        self.assertEqual(report.errors[0][:8], 'Line 2: ')
+
+    def test_declared_terminals(self):
+        G, report = load_bnf(['%terminals + num', 'E -> E + num | num'])
+        self.assertEqual([t.Name for t in G.terminals], ['+', 'num'])
+        self.assertEqual(report.errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from cmp.grammalyzer.matrix import compute_firsts_matrix, compute_follows_matrix
+from cmp.grammalyzer.utils import compute_firsts, compute_follows
+from cmp.utils import BitContainerSet
+
+from .test_closure_templates import random_grammar
+
+try:
+    import numpy
+except ModuleNotFoundError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'the matrix backend needs numpy')
+class MatrixBackendTest(unittest.TestCase):
+    def test_random_grammars(self):
+        for seed in range(300):
+            with self.subTest(seed=seed):
+                G = random_grammar(seed)
+                firsts = compute_firsts(G)
+                follows = compute_follows(G, firsts)
+                self.assertEqual(compute_firsts_matrix(G), firsts)
+                self.assertEqual(compute_follows_matrix(G, firsts), follows)
+                self.assertEqual(compute_firsts_matrix(G, BitContainerSet), firsts)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from cmp.grammalyzer.parsing import LALR1Parser, LR1Parser, MinimalLR1Parser
+from cmp.pycompiler import Grammar
+
+from .test_closure_templates import random_grammar
+
+
+class MinimalLR1ParserTest(unittest.TestCase):
+    def test_random_grammars(self):
+        """
+        Pager's merging adds no conflict to the LR(1) tables and has between the LALR(1) and LR(1) states
+        """
+        for seed in range(300):
+            with self.subTest(seed=seed):
+                G = random_grammar(seed)
+                lr1, pager, lalr = LR1Parser(G), MinimalLR1Parser(G), LALR1Parser(G)
+                if lr1.conflict is None:
+                    self.assertIsNone(pager.conflict)
+                self.assertLessEqual(len(lalr.automaton), len(pager.automaton))
+                self.assertLessEqual(len(pager.automaton), len(lr1.automaton))
+
+    def test_lr1_not_lalr1(self):
+        G = Grammar()
+        S = G.NonTerminal('S', True)
+        A, B = G.NonTerminals('A B')
+        a, b, c, d, e = G.Terminals('a b c d e')
+        S %= a + A + d | b + B + d | a + B + e | b + A + e
+        A %= c
+        B %= c
+
+        lalr = LALR1Parser(G)
+        self.assertIsNotNone(lalr.conflict)
+        pager = MinimalLR1Parser(G)
+        self.assertIsNone(pager.conflict)
+        # the two reductions of c are kept in different states
+        self.assertEqual(len(pager.automaton), len(lalr.automaton) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
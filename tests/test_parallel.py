@@ -0,0 +1,25 @@
+import unittest
+
+from cmp.grammalyzer.automatas import build_lr1_automaton, build_lr1_automaton_parallel
+
+from .test_closure_templates import random_grammar
+
+
+class ParallelLR1AutomatonTest(unittest.TestCase):
+    def test_random_grammars(self):
+        """
+        The parallel construction has the states and the transitions of the sequential one
+        """
+        for seed in range(40):
+            for chunksize in (None, 1):
+                with self.subTest(seed=seed, chunksize=chunksize):
+                    G = random_grammar(seed).AugmentedGrammar(True)
+                    sequential = list(build_lr1_automaton(G))
+                    parallel = list(build_lr1_automaton_parallel(G, 2, chunksize=chunksize))
+                    self.assertEqual([state.state for state in parallel], [state.state for state in sequential])
+                    self.assertEqual([list(state.transitions) for state in parallel],
+                                     [list(state.transitions) for state in sequential])
+
+
+if __name__ == '__main__':
+    unittest.main()
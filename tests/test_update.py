@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from cmp.grammalyzer.cleaner import delete_immediate_left_recursion
+from cmp.grammalyzer.parsing import LALR1Parser, SLR1Parser
+from cmp.pycompiler import Sentence
+
+from .test_closure_templates import random_grammar
+
+
+class ParserUpdateTest(unittest.TestCase):
+    def assert_same_parser(self, parser, G):
+        """
+        The parser updated after the edits of G has the automaton and the tables of a new one
+        """
+        fresh = type(parser)(G)
+        self.assertEqual([state.state for state in parser.automaton], [state.state for state in fresh.automaton])
+        self.assertEqual(parser.action, fresh.action)
+        self.assertEqual(parser.goto, fresh.goto)
+
+    def test_update_after_the_cleaner(self):
+        # delete_immediate_left_recursion names S' the new non terminal of S, the same name of the augmented start
+        for seed in range(200):
+            for parser_type in (SLR1Parser, LALR1Parser):
+                with self.subTest(seed=seed, parser=parser_type.__name__):
+                    rnd = random.Random(seed)
+                    G = random_grammar(seed)
+                    # X -> X would leave X' -> X', which the cleaner expands forever
+                    for production in [p for p in G.Productions if p.Right == Sentence(p.Left)]:
+                        G.Remove_Production(production)
+                    delete_immediate_left_recursion(G)
+                    parser = parser_type(G)
+                    X = rnd.choice(G.nonTerminals)
+                    X %= Sentence(*[rnd.choice(G.terminals + G.nonTerminals) for _ in range(2)])
+                    parser.update()
+                    self.assert_same_parser(parser, G)
+
+    def test_update_after_edits(self):
+        for seed in range(100):
+            for parser_type in (SLR1Parser, LALR1Parser):
+                with self.subTest(seed=seed, parser=parser_type.__name__):
+                    rnd = random.Random(seed)
+                    G = random_grammar(seed)
+                    parser = parser_type(G)
+                    for _ in range(4):
+                        if rnd.random() < 0.4 and len(G.Productions) > 1:
+                            G.Remove_Production(rnd.choice(G.Productions))
+                        else:
+                            X = rnd.choice(G.nonTerminals)
+                            X %= Sentence(*[rnd.choice(G.terminals + G.nonTerminals) for _ in range(rnd.randint(1, 3))])
+                        parser.update()
+                        self.assert_same_parser(parser, G)
+
+
+if __name__ == '__main__':
+    unittest.main()